@@ -0,0 +1,88 @@
+""" Benchmarks shortest path search over synthetic adapter graphs.
+
+    python benchmarks/bench_adapter_path.py [n_collections]
+
+The first section times utils.bfs_shortest_path against the previous list based search on a plain
+graph. The second registers n_collections collections and adapters in binx.registry and times
+registry.adapter_path with a cold and a warm path cache.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # run from a checkout
+
+from binx.collection import BaseCollection
+from binx.registry import adapter_path, register_adapter_to_collection, register_adaptable_collection, _bump_generation
+from binx.utils import bfs_shortest_path
+
+
+def list_bfs_shortest_path(graph, start, end):
+    """ the previous list based search for comparison
+    """
+    def _bfs_paths(graph, start, end):
+        queue = [(start, [start])]
+        while queue:
+            (vertex, path) = queue.pop(0)
+            for next_vertex in graph[vertex] - set(path):
+                if next_vertex == end:
+                    yield path + [next_vertex]
+                else:
+                    queue.append((next_vertex, path + [next_vertex]))
+    try:
+        return next(_bfs_paths(graph, start, end))
+    except StopIteration:
+        return []
+
+
+def make_graph(n, degree=3, seed=42):
+    """ a chain of n vertices with degree - 1 random back edges each so the target is at depth n - 1
+    """
+    rng = random.Random(seed)
+    graph = {i: {i + 1} for i in range(n - 1)}
+    graph[n - 1] = set()
+    for i in range(1, n):
+        graph[i].update(rng.randrange(0, i) for _ in range(degree - 1))
+    return graph
+
+
+def timed(func, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def bench_bfs(n):
+    graph = make_graph(n)
+    path, t_new = timed(bfs_shortest_path, graph, 0, n - 1, repeat=5)
+    print('bfs_shortest_path       {:>7} vertices  {:>10.5f}s  path length {}'.format(n, t_new, len(path)))
+
+    small = min(n, 2000)   # the list based search is quadratic so it only runs on a smaller graph
+    graph = make_graph(small)
+    _, t_old = timed(list_bfs_shortest_path, graph, 0, small - 1)
+    _, t_new = timed(bfs_shortest_path, graph, 0, small - 1, repeat=5)
+    print('list bfs vs deque bfs   {:>7} vertices  {:>10.5f}s  {:>10.5f}s'.format(small, t_old, t_new))
+
+
+def bench_registry(n):
+    colls = [type('BenchCollection{}'.format(i), (BaseCollection, ), {}) for i in range(n)]
+    for i in range(n - 1):
+        adapter = type('BenchAdapter{}'.format(i), (object, ), {
+            'from_collection_class': colls[i], 'target_collection_class': colls[i + 1]})
+        register_adapter_to_collection(colls[i].get_fully_qualified_class_path(), adapter)
+        register_adaptable_collection(colls[i + 1].get_fully_qualified_class_path(), colls[i])
+
+    _bump_generation()
+    adapters, t_cold = timed(adapter_path, colls[0], colls[-1])
+    _, t_warm = timed(adapter_path, colls[0], colls[-1], repeat=100)
+    print('adapter_path            {:>7} collections  cold {:.5f}s  warm {:.7f}s  {} adapters'.format(
+        n, t_cold, t_warm, len(adapters)))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    bench_bfs(n)
+    bench_registry(n)
@@ -5,13 +5,23 @@ overridden by the user which must return an instance of AdapterOutputContainer.
 helper method
 
 Once the class is declared the user register's the adapter using the register static method
+
+A route through the adapter graph can be resolved once with BaseCollection.plan_from, which returns an AdapterPlan
+that can be called with many input collections. A FanOutPlan does the same for one source and many targets.
 """
 import abc
-from .registry import register_adapter_to_collection, register_adaptable_collection
-from .exceptions import AdapterFunctionError
+from concurrent.futures import wait, FIRST_COMPLETED
+from collections import deque
+from .registry import register_adapter_to_collection, register_adaptable_collection, record_adapter_cost, adapter_path
+from .exceptions import AdapterFunctionError, AdapterChainError
 
+import asyncio
 import copy
+import functools
 import inspect
+import time
+
+import pandas as pd
 
 def check_adapter_call(method):
     """ a helper decorater for the __call__ method that does some type checking
@@ -60,11 +70,34 @@ class AdapterOutputContainer(object):
 class AbstractAdapter(abc.ABC):
     """ Concrete Adapters subclass this class and override its adapt method with an implementation.
     Other methods may be added as helper classes
+
+    cost is the declared cost of the adapter used when routing with cost='static' or cost='measured'. If
+    measure_cost is True each run in an AdapterPlan records its seconds per input row in binx.registry,
+    which cost='measured' prefers over the declared cost.
+
+    If cacheable is True the adapter's output only depends on its input collection and context, so chains made of
+    cacheable adapters can be memoized by binx.cache.AdapterCache or binx.cache.DiskAdapterCache. version is part
+    of the cache key and should be bumped whenever a change to adapt changes its output, so that persisted entries
+    made by the old code are not reused.
+
+    Adapters whose output rows each depend only on one input row, in order, can set rowwise to True. Chains of
+    rowwise adapters are run only over newly appended rows by BaseCollection.adapt_incremental.
+
+    Adapters that always return data matching the target serializer can set schema_conformant to True. When such
+    an adapter is not the last hop of a chain, render_return loads its output into the intermediate collection
+    without validation. The final collection of a chain is always validated.
     """
 
     target_collection_class = None
     from_collection_class = None
     is_registered = False #NOTE set to True in the adapter registery
+    cost = 1.0
+    measure_cost = False
+    schema_conformant = False
+    cacheable = False
+    version = 1
+    rowwise = False
+    _intermediate = False  #NOTE set on the adapter instances of a plan that produce intermediate collections
 
 
     def render_return(self, data, **context):
@@ -72,7 +105,7 @@ class AbstractAdapter(abc.ABC):
         Must return the data in an instance of AdapterOutputContainer
         """
         coll = self.target_collection_class()
-        coll.load_data(data)
+        coll.load_data(data, validate=not (self.schema_conformant and self._intermediate))
         return AdapterOutputContainer(coll, **context)
 
 
@@ -99,11 +132,39 @@ class AbstractAdapter(abc.ABC):
 
 
 
+class AsyncAbstractAdapter(AbstractAdapter):
+    """ An adapter whose adapt method is a coroutine, for adapters that wait on I/O such as a cache or a local
+    service. These can only be run with BaseCollection.aadapt or AdapterPlan.acall. render_return is a regular
+    method and should be returned from adapt as usual.
+    """
+
+    @abc.abstractmethod
+    async def adapt(self, collection, **context):
+        """ The user must override this coroutine to do the data cleaning. Must return self.render_return(...)
+        """
+
+
+    async def __call__(self, collection, **context):
+        """ Awaits adapt with the same type checking as AbstractAdapter.__call__
+        """
+        if not isinstance(collection, self.from_collection_class):
+            raise TypeError('Cannot adapt from type {}'.format(collection))
+
+        result = await self.adapt(collection, **context)
+
+        if not isinstance(result, AdapterOutputContainer):
+            raise TypeError('Adapters must return an instance of AdapterOutputContainer')
+        return result
+
+
+
+
 class PluggableAdapter(AbstractAdapter):
     """ creates a pluggable interface for Adapters. A user should subclass this class and provide a calc
     object that
     """
     calc = None
+    calc_signature = ('collection', 'context')   #NOTE the last name must be the **kwargs variable
 
     def __init__(self):
         self._check_calc(self.__class__.calc) # perform this check once on init
@@ -115,9 +176,12 @@ class PluggableAdapter(AbstractAdapter):
         if not callable(calc):
             raise TypeError('calc field must be callable')
 
+        calc_signature = getattr(self, 'calc_signature', PluggableAdapter.calc_signature)  # NOTE also called unbound
+        first, kwargs = calc_signature
         sig = inspect.signature(calc).parameters
-        assert sorted(list(sig.keys())) == ['collection', 'context'], 'Incorrect signature provided to Adapter.calc. Must have signature "collection", "**context"'
-        assert sig['context'].kind == inspect.Parameter.VAR_KEYWORD, '"context" must be kwargs variable (**context)'
+        assert sorted(list(sig.keys())) == sorted(calc_signature), \
+            'Incorrect signature provided to Adapter.calc. Must have signature "{}", "**{}"'.format(first, kwargs)
+        assert sig[kwargs].kind == inspect.Parameter.VAR_KEYWORD, '"{0}" must be kwargs variable (**{0})'.format(kwargs)
         return True
 
     def adapt(self, collection, **context):
@@ -133,6 +197,359 @@ class PluggableAdapter(AbstractAdapter):
         return self.render_return(data, **context)
 
 
+class DataFrameAdapter(PluggableAdapter):
+    """ A pluggable adapter whose calc works on DataFrames. calc has the signature "df", "**context" and must return
+    a 2-tuple of a DataFrame and a context dict.
+
+    When two DataFrameAdapters follow each other in an AdapterPlan, the DataFrame returned by the first is handed
+    straight to the second. No intermediate collection is built or validated. Collections are only made at the
+    boundaries of a run of DataFrameAdapters, or for every hop if the chain is called with accumulate=True.
+    """
+    calc_signature = ('df', 'context')
+
+    def frame_from(self, collection):
+        """ returns the input DataFrame for calc from a collection of from_collection_class
+        """
+        if not isinstance(collection, self.from_collection_class):
+            raise TypeError('Cannot adapt from type {}'.format(collection))
+        return collection.to_dataframe()
+
+
+    def adapt_frame(self, df, **context):
+        """ calls calc with a DataFrame and returns its DataFrame and context
+        """
+        try:
+            df, context = self.__class__.calc(df, **context)
+        except ValueError: # we enforce returning a two-tuple
+            raise AdapterFunctionError('Return type of DataFrameAdapter.calc must be a 2-tuple of a DataFrame and context dict')
+        if not isinstance(df, pd.DataFrame):
+            raise AdapterFunctionError('The first return value of DataFrameAdapter.calc must be a DataFrame')
+        if not isinstance(context, dict):
+            raise AdapterFunctionError('The second return value of DataFrameAdapter.calc must be a dictionary')
+        return df, context
+
+
+    def adapt(self, collection, **context):
+        """ calls calc with the collection's DataFrame and loads the result into the target collection
+        """
+        df, context = self.adapt_frame(collection.to_dataframe(), **context)
+        return self.render_return(df, **context)
+
+
+class AdapterPlan(object):
+    """ An immutable, resolved route through the adapter chain. The adapter classes are instantiated and
+    validated once when the plan is made, so calling the plan does no planning work. A plan can be called
+    any number of times with different input collections and context.
+
+    NOTE the adapter instances are shared by every call to the plan so adapt methods should not store per call
+    state on self.
+
+    This is used internally by BaseCollection.adapt and returned by BaseCollection.plan_from
+    """
+    __slots__ = ('_from_collection_class', '_target_collection_class', '_adapters')
+
+    def __init__(self, from_collection_class, target_collection_class, adapter_classes):
+        adapter_classes = tuple(adapter_classes)
+        if len(adapter_classes) == 0:
+            raise AdapterChainError('An AdapterPlan must have at least one adapter')
+
+        current = from_collection_class
+        for adapter_class in adapter_classes:
+            if adapter_class is None:
+                raise AdapterChainError('No adapter is registered from {}'.format(current.__name__))
+            if adapter_class.from_collection_class is not current:
+                raise AdapterChainError('{} does not adapt from {}'.format(adapter_class.__name__, current.__name__))
+            current = adapter_class.target_collection_class
+        if current is not target_collection_class:
+            raise AdapterChainError('The adapters do not end at {}'.format(target_collection_class.__name__))
+
+        object.__setattr__(self, '_from_collection_class', from_collection_class)
+        object.__setattr__(self, '_target_collection_class', target_collection_class)
+        object.__setattr__(self, '_adapters', tuple(adapter_class() for adapter_class in adapter_classes))
+        for adapter in self._adapters[:-1]:
+            adapter._intermediate = True   # only intermediates may skip validation
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AdapterPlan is immutable')
+
+
+    def __reduce__(self):
+        # the adapters are re-instantiated when unpickled so plans can be sent to a process pool
+        return AdapterPlan, (self._from_collection_class, self._target_collection_class,
+            tuple(a.__class__ for a in self._adapters))
+
+
+    @property
+    def from_collection_class(self):
+        return self._from_collection_class
+
+    @property
+    def target_collection_class(self):
+        return self._target_collection_class
+
+    @property
+    def adapters(self):
+        """ a tuple of the adapter instances in the order they are called
+        """
+        return self._adapters
+
+
+    def __len__(self):
+        return len(self._adapters)
+
+
+    def __repr__(self):
+        return '<AdapterPlan {}>'.format(' -> '.join(
+            [self._from_collection_class.__name__] + [a.target_collection_class.__name__ for a in self._adapters]))
+
+
+    def _hop(self, i, accumulate, current_input, frame, current_context):
+        """ runs the i-th adapter of the plan. Returns a 3-tuple of its AdapterOutputContainer, or None if a DataFrame
+        is handed to the next adapter, the handed off DataFrame or None and the adapter's context
+        """
+        adapter = self._adapters[i]
+        if isinstance(adapter, AsyncAbstractAdapter):
+            raise TypeError('{} is an async adapter. Use BaseCollection.aadapt'.format(adapter.__class__.__name__))
+
+        last = len(self._adapters) - 1
+        hand_off = not accumulate and i < last and isinstance(adapter, DataFrameAdapter) \
+            and isinstance(self._adapters[i + 1], DataFrameAdapter)
+        if frame is not None or hand_off:
+            if frame is None:
+                frame = adapter.frame_from(current_input)
+            frame, context = adapter.adapt_frame(frame, **current_context)
+            if hand_off:
+                return None, frame, context
+            adapter_output = adapter.render_return(frame, **context)
+        else:
+            adapter_output = adapter(current_input, **current_context) # adapt data to the next type of collection
+        return adapter_output, None, adapter_output.context
+
+
+    async def _ahop(self, i, current_input, current_context):
+        """ awaits the i-th adapter of the plan, which must be an AsyncAbstractAdapter
+        """
+        adapter_output = await self._adapters[i](current_input, **current_context)
+        return adapter_output, None, adapter_output.context
+
+
+    def __call__(self, input_collection, accumulate=False, **adapter_context):
+        """ runs the input collection through each adapter. The adapter context accumulates over each call so that
+        kwargs needed by an adapter further along the chain make it there. If accumulate is True each intermediate
+        collection is added to the context under its class name.
+
+        returns the final AdapterOutputContainer with the accumulated context. Any error raises an AdapterChainError
+        that has the context at the point of failure
+        """
+        current_context = adapter_context  # set starting point... these are instances and will be modified below
+        current_input = input_collection  # NOTE this is an instance with data to be transformed.. not a class
+        adapter_output = None
+        frame = None  # a DataFrame handed between consecutive DataFrameAdapters in place of a collection
+        try:
+            for i, adapter in enumerate(self._adapters):
+                # if accumulate make a new key in the current context for the current collection the collection name in the registry
+                if accumulate and i > 0:
+                    coll_id = current_input.__class__.__name__
+                    current_context[coll_id] = copy.copy(current_input)
+
+                rows = len(frame) if frame is not None else len(current_input)
+                start = time.perf_counter()
+                output, frame, context = self._hop(i, accumulate, current_input, frame, current_context)
+                if adapter.measure_cost:
+                    record_adapter_cost(adapter.__class__, time.perf_counter() - start, rows)
+
+                current_context = {**current_context, **context}
+                if output is not None:
+                    adapter_output = output
+                current_input = None if output is None else output.collection
+
+        except Exception as err:
+            e = AdapterChainError('An error occurred within the adapter chain')
+            e.context = current_context
+            raise e from err
+
+        adapter_output._context = current_context # set final context
+        return adapter_output
+
+
+    async def acall(self, input_collection, accumulate=False, executor=None, **adapter_context):
+        """ the coroutine version of calling the plan. AsyncAbstractAdapters are awaited and other adapters are run
+        in executor, or the event loop's default executor if None, so they don't block the loop. The context is
+        accumulated the same way as a plain call.
+        """
+        loop = asyncio.get_event_loop()
+        current_context = adapter_context
+        current_input = input_collection
+        adapter_output = None
+        frame = None
+        try:
+            for i, adapter in enumerate(self._adapters):
+                if accumulate and i > 0:
+                    coll_id = current_input.__class__.__name__
+                    current_context[coll_id] = copy.copy(current_input)
+
+                rows = len(frame) if frame is not None else len(current_input)
+                start = time.perf_counter()
+                if isinstance(adapter, AsyncAbstractAdapter):
+                    output, frame, context = await self._ahop(i, current_input, current_context)
+                else:
+                    output, frame, context = await loop.run_in_executor(executor,
+                        functools.partial(self._hop, i, accumulate, current_input, frame, current_context))
+                if adapter.measure_cost:
+                    record_adapter_cost(adapter.__class__, time.perf_counter() - start, rows)
+
+                current_context = {**current_context, **context}
+                if output is not None:
+                    adapter_output = output
+                current_input = None if output is None else output.collection
+
+        except Exception as err:
+            e = AdapterChainError('An error occurred within the adapter chain')
+            e.context = current_context
+            raise e from err
+
+        adapter_output._context = current_context
+        return adapter_output
+
+
+def _run_fan_out_hop(adapter, collection, context):
+    """ runs a single adapter of a FanOutPlan. This is module level so that it can be sent to a process pool.
+    Returns a 2-tuple of the AdapterOutputContainer and the seconds it took
+    """
+    start = time.perf_counter()
+    adapter_output = adapter(collection, **context)
+    return adapter_output, time.perf_counter() - start
+
+
+class FanOutPlan(object):
+    """ Plans the routes from one collection class to many target classes as a tree of adapters. Routes that
+    share a prefix share its nodes, so each shared intermediate collection is computed once per call. Branches
+    are independent and can run concurrently on any concurrent.futures Executor.
+
+    Each target gets the context accumulated along its own route, the same as adapt. Adapters run as part of a
+    fan out always build their output collection so DataFrameAdapters do not hand frames to each other here, and
+    async adapters are not supported.
+
+    NOTE like AdapterPlan the adapter instances are shared by every call to the plan
+    """
+
+    def __init__(self, from_collection_class, target_collection_classes, cost='hops'):
+        self.from_collection_class = from_collection_class
+        self.target_collection_classes = tuple(target_collection_classes)
+
+        self._adapters = []    # node index -> adapter instance. Parents always come before their children
+        self._parents = []     # node index -> parent node index or None for the source
+        self._children = []    # node index -> list of child node indexes
+        self._targets = []     # node index -> list of target classes that end at the node
+        nodes = {}             # route prefix of adapter classes -> node index
+
+        for target in self.target_collection_classes:
+            adapter_classes = adapter_path(from_collection_class, target, cost=cost)
+            if len(adapter_classes) == 0:
+                raise AdapterChainError('{} could not be found on the adapter chain for {}'.format(
+                    from_collection_class.__name__, target.__name__))
+            route = AdapterPlan(from_collection_class, target, adapter_classes)
+            parent = None
+            for k, adapter in enumerate(route.adapters):
+                if isinstance(adapter, AsyncAbstractAdapter):
+                    raise AdapterChainError('{} is an async adapter and can not be part of a FanOutPlan'.format(
+                        adapter.__class__.__name__))
+                prefix = tuple(a.__class__ for a in route.adapters[:k + 1])
+                if prefix not in nodes:
+                    nodes[prefix] = len(self._adapters)
+                    self._adapters.append(adapter)
+                    self._parents.append(parent)
+                    self._children.append([])
+                    self._targets.append([])
+                    if parent is not None:
+                        self._children[parent].append(nodes[prefix])
+                parent = nodes[prefix]
+            self._targets[parent].append(target)
+
+        # a node may skip validation only if its collection is an intermediate for other nodes
+        for i, adapter in enumerate(self._adapters):
+            adapter._intermediate = len(self._children[i]) > 0 and len(self._targets[i]) == 0
+
+
+    def __len__(self):
+        """ the number of adapters run on each call
+        """
+        return len(self._adapters)
+
+
+    def _hop_args(self, i, outputs, input_collection, adapter_context, accumulate):
+        parent = self._parents[i]
+        collection, context = (input_collection, adapter_context) if parent is None else outputs[parent]
+        if accumulate and parent is not None:
+            context = {**context, collection.__class__.__name__: copy.copy(collection)}
+        return self._adapters[i], collection, context
+
+
+    def __call__(self, input_collection, executor=None, accumulate=False, **adapter_context):
+        """ adapts the input collection to every target. If executor is None the adapters run one after another,
+        otherwise each adapter is submitted to the executor as soon as its input collection is ready.
+        If accumulate is True each intermediate collection is added to the context of its branch.
+
+        returns a dictionary of target classes and (collection, context) tuples. Any error raises an
+        AdapterChainError that has the context of the failing adapter's input
+        """
+        outputs = {}   # node index -> (collection, context). Dropped once no remaining node needs it
+        results = {}
+        roots = [i for i, parent in enumerate(self._parents) if parent is None]
+        remaining = [len(c) for c in self._children]
+
+        def finish(i, result):
+            adapter_output, seconds = result
+            adapter = self._adapters[i]
+            if adapter.measure_cost:
+                record_adapter_cost(adapter.__class__, seconds, len(hop_args[i][1]))
+            context = {**hop_args.pop(i)[2], **adapter_output.context}
+            outputs[i] = (adapter_output.collection, context)
+            for target in self._targets[i]:
+                results[target] = outputs[i]
+            parent = self._parents[i]
+            if parent is not None:
+                remaining[parent] -= 1
+                if remaining[parent] == 0:
+                    outputs.pop(parent)
+            return self._children[i]
+
+        hop_args = {}
+        current = None
+        try:
+            if executor is None:
+                queue = deque(roots)
+                while queue:
+                    current = queue.popleft()
+                    hop_args[current] = self._hop_args(current, outputs, input_collection, adapter_context, accumulate)
+                    queue.extend(finish(current, _run_fan_out_hop(*hop_args[current])))
+            else:
+                pending = {}
+                def submit(i):
+                    hop_args[i] = self._hop_args(i, outputs, input_collection, adapter_context, accumulate)
+                    pending[executor.submit(_run_fan_out_hop, *hop_args[i])] = i
+
+                for i in roots:
+                    submit(i)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        current = pending.pop(future)
+                        for child in finish(current, future.result()):
+                            submit(child)
+
+        except Exception as err:
+            if executor is not None:
+                for future in pending:
+                    future.cancel()
+            e = AdapterChainError('An error occurred within the adapter chain')
+            e.context = hop_args[current][2] if current in hop_args else adapter_context
+            raise e from err
+
+        return results
+
+
 def register_adapter(adapter_class):
     """ Registers the adapter class in the graph chain by setting its to and from classes
     """
@@ -0,0 +1,118 @@
+""" Arrow and Parquet conversion for collections. pyarrow is an optional dependency and is only imported when
+one of these functions is called.
+
+The Arrow schema is derived from the serializer's load fields. Columns are named by data_key like the records
+and DataFrames that load_data accepts, so a table written by a collection can be loaded back into it. Tables
+are built from the typed arrays of a ColumnStore and loaded with the column-wise DataFrame validation in
+binx.columnar.
+"""
+
+import pandas as pd
+from marshmallow import fields
+
+from .storage import ColumnStore
+
+import logging
+l = logging.getLogger(__name__)
+
+
+def import_pyarrow():
+    """ returns the pyarrow module or raises an ImportError explaining that it is needed
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError('pyarrow is required for Arrow and Parquet support. Install it with pip install pyarrow') \
+            from err
+    return pyarrow
+
+
+def arrow_type(field):
+    """ returns the Arrow type for a marshmallow field. Raises TypeError for fields that have no Arrow type,
+    such as Dict and Nested
+    """
+    pa = import_pyarrow()
+    if isinstance(field, fields.Boolean):
+        return pa.bool_()
+    if isinstance(field, fields.Integer):
+        return pa.int64()
+    if isinstance(field, fields.Float):
+        return pa.float64()
+    if isinstance(field, fields.String):
+        return pa.string()
+    if isinstance(field, fields.Date):  # NOTE Date subclasses DateTime
+        return pa.date32()
+    if isinstance(field, fields.DateTime):
+        return pa.timestamp('us')
+    if isinstance(field, fields.List):
+        return pa.list_(arrow_type(field.inner))
+    raise TypeError('Field {} of type {} has no Arrow type'.format(field.name, type(field).__name__))
+
+
+def arrow_schema(serializer):
+    """ returns a pyarrow.Schema for the load fields of a serializer instance. Fields that are not required
+    or allow None are nullable
+    """
+    pa = import_pyarrow()
+    schema_fields = []
+    for name, field in serializer.load_fields.items():
+        key = field.data_key if field.data_key is not None else name
+        schema_fields.append(pa.field(key, arrow_type(field), nullable=field.allow_none or not field.required))
+    return pa.schema(schema_fields)
+
+
+def collection_to_arrow(collection):
+    """ returns a pyarrow.Table of a collection's load fields. Internals are converted with a temporary ColumnStore
+    """
+    pa = import_pyarrow()
+    serializer = collection.serializer
+    schema = arrow_schema(serializer)
+
+    if collection.is_columnar:
+        store = collection._data
+    else:
+        store = ColumnStore(serializer, collection.internal_class)
+        store.extend(collection._data)
+    columns = store.columns()
+
+    arrays = []
+    for name, field in serializer.load_fields.items():
+        key = field.data_key if field.data_key is not None else name
+        atype = schema.field(key).type
+        if name not in columns:
+            arrays.append(pa.nulls(len(store), type=atype))
+            continue
+
+        arr, mask = columns[name]
+        if arr.dtype.kind == 'M':
+            array = pa.array(arr, mask=mask).cast(atype)
+        elif arr.dtype.kind in ('O', 'U'):
+            values = arr.tolist()
+            if mask is not None and mask.any():
+                values = [None if m else v for v, m in zip(values, mask.tolist())]
+            array = pa.array(values, type=atype)
+        else:
+            array = pa.array(arr, mask=mask, type=atype)
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def arrow_to_dataframe(table, serializer):
+    """ converts a pyarrow.Table to a DataFrame that load_data can validate column by column. Dates and datetimes
+    become datetime64 columns. Only datetime fields with a field level format other than iso are written back to
+    strings, since those have to be parsed by the field
+    """
+    import_pyarrow()
+    df = table.to_pandas(date_as_object=False)
+
+    for name, field in serializer.load_fields.items():
+        key = field.data_key if field.data_key is not None else name
+        if key not in df.columns or not isinstance(field, fields.DateTime) or isinstance(field, fields.Date) \
+                or name in serializer.dateformat_fields \
+                or field.format in (None, 'iso', 'iso8601'):
+            continue
+        if str(df[key].dtype) == 'datetime64[ns]':
+            df[key] = [None if pd.isna(v) else field._serialize(v.to_pydatetime(), name, None) for v in df[key]]
+    return df
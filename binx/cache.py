@@ -0,0 +1,341 @@
+""" An opt-in in-memory cache for the results of adapter chains. Entries are keyed by the content fingerprint
+of the input collection, the adapters on the route to the target class and a hash of the context kwargs, and
+are evicted least recently used first when the entry count or estimated size limits are exceeded.
+
+Only chains where every adapter sets cacheable = True are cached. Pass an AdapterCache to BaseCollection.adapt
+or set one for all calls with set_default_cache.
+
+DiskAdapterCache has the same interface but pickles entries to files in a directory, so results outlive the
+process. Its keys use class paths and adapter versions instead of class objects and it evicts the least recently
+used files when the directory grows past max_bytes.
+"""
+
+from collections import OrderedDict
+import copy
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import uuid
+
+from .exceptions import FingerprintError
+
+import logging
+l = logging.getLogger(__name__)
+
+
+_default_cache = None
+
+
+def set_default_cache(cache):
+    """ sets the AdapterCache used by adapt when none is passed. None turns caching off
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_cache():
+    """ returns the default AdapterCache or None
+    """
+    return _default_cache
+
+
+def context_hash(context):
+    """ returns a digest of the context kwargs or None if they can not be pickled
+    """
+    try:
+        payload = pickle.dumps(sorted(context.items()), protocol=4)
+    except Exception:
+        return None
+    return hashlib.sha256(payload).hexdigest()
+
+
+def input_fingerprint(collection):
+    """ returns the fingerprint of an input collection or None if its values can not be fingerprinted
+    """
+    try:
+        return collection.fingerprint()
+    except FingerprintError as err:
+        l.debug('Not caching {}: {}'.format(collection.__class__.__name__, err))
+        return None
+
+
+def _sizeof(value):
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def estimate_nbytes(collection):
+    """ a rough estimate of the memory held by a collection's internals or columns
+    """
+    if collection.is_columnar:
+        nbytes = 0
+        for arr, mask in collection._data.columns().values():
+            nbytes += arr.nbytes + (0 if mask is None else mask.nbytes)
+            if arr.dtype.kind == 'O':
+                nbytes += sum(_sizeof(v) for v in arr)
+        return nbytes
+
+    nbytes = sys.getsizeof(collection._data)
+    internal_class = collection.internal_class
+    slots = internal_class._binx_fields if getattr(internal_class, '_binx_compact', False) else None
+    for obj in collection._data:
+        nbytes += sys.getsizeof(obj)
+        if slots is not None:
+            values = [getattr(obj, name, None) for name in slots]   # NOTE vars would add an empty __dict__ per row
+        else:
+            values = obj.__dict__.values() if hasattr(obj, '__dict__') else \
+                [getattr(obj, name, None) for name in getattr(obj, '__slots__', ())]
+        nbytes += sum(_sizeof(v) for v in values)
+    return nbytes
+
+
+def copy_collection(collection):
+    """ returns a new collection that shares the internals or arrays of collection but can be appended to
+    without changing it
+    """
+    new = copy.copy(collection)
+    new._data = collection._data.copy()
+    new._lineage = uuid.uuid4().hex  # NOTE the copies can be appended to separately
+    new._BaseCollection__collection_id = uuid.uuid4().hex
+    return new
+
+
+class AdapterCache(object):
+    """ An LRU cache of adapter chain results. max_entries and max_bytes limit the number of entries and the
+    estimated size of the cached collections. Either can be None for no limit. Entries larger than max_bytes
+    are not stored. It is safe to share between threads.
+
+    Collections are copied on the way in and out so appending to a returned collection does not change the
+    cache. The internals themselves are shared and should not be mutated.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (collection, context, nbytes)
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+
+    def make_key(self, input_collection, plan, accumulate, context):
+        """ returns the cache key for running plan on input_collection or None if the call can not be cached. The
+        input is fingerprinted in full on every lookup since its internals may have been changed in place. Inputs
+        that can not be fingerprinted are not cached
+        """
+        if not all(getattr(adapter, 'cacheable', False) for adapter in plan.adapters):
+            return None
+        digest = context_hash(context)
+        if digest is None:
+            return None
+        fingerprint = input_fingerprint(input_collection)
+        if fingerprint is None:
+            return None
+        route = tuple(adapter.__class__ for adapter in plan.adapters)
+        return (fingerprint, plan.target_collection_class, route, bool(accumulate), digest)
+
+
+    def get(self, key):
+        """ returns a 2-tuple of a copy of the cached collection and its context or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        collection, context, _ = entry
+        return copy_collection(collection), dict(context)
+
+
+    def put(self, key, collection, context):
+        """ stores a copy of collection and its context, evicting least recently used entries to stay in the limits
+        """
+        nbytes = estimate_nbytes(collection)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            l.debug('Not caching a collection of about {} bytes'.format(nbytes))
+            return
+        entry = (copy_collection(collection), dict(context), nbytes)
+
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[2]
+            self._entries[key] = entry
+            self._nbytes += nbytes
+            while len(self._entries) > 0 and (
+                    (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                    (self.max_bytes is not None and self._nbytes > self.max_bytes)):
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted[2]
+                self._evictions += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def stats(self):
+        """ returns a dictionary of hits, misses, evictions, the number of entries and their estimated bytes
+        """
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                'entries': len(self._entries), 'nbytes': self._nbytes}
+
+
+def _class_path(klass):
+    return klass.__module__ + '.' + klass.__qualname__
+
+
+class DiskAdapterCache(object):
+    """ A persistent cache of adapter chain results. Each entry is a pickle file in path named by a digest of its
+    key. Keys are made of the input's fingerprint, the target class path, the class path and version of each
+    adapter on the route and the context hash, so entries can be shared between processes and runs.
+
+    max_bytes limits the total size of the entry files. When a put exceeds it the least recently used files are
+    removed. Hits are loaded by unpickling the stored collection and are not validated again.
+
+    Writes go to a temporary file that is renamed into place, so concurrent readers never see a partial entry.
+    """
+
+    suffix = '.pkl'
+
+    def __init__(self, path, max_bytes=2 ** 30):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+
+    def make_key(self, input_collection, plan, accumulate, context):
+        """ returns the cache key for running plan on input_collection or None if the call can not be cached. The
+        input is fingerprinted in full on every lookup since its internals may have been changed in place. Inputs
+        that can not be fingerprinted are not cached
+        """
+        if not all(getattr(adapter, 'cacheable', False) for adapter in plan.adapters):
+            return None
+        digest = context_hash(context)
+        if digest is None:
+            return None
+        fingerprint = input_fingerprint(input_collection)
+        if fingerprint is None:
+            return None
+        route = tuple((_class_path(adapter.__class__), str(adapter.version)) for adapter in plan.adapters)
+        return (fingerprint, _class_path(plan.target_collection_class), route, bool(accumulate), digest)
+
+
+    def _filename(self, key):
+        return os.path.join(self.path, hashlib.sha256(repr(key).encode()).hexdigest() + self.suffix)
+
+
+    def _files(self):
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(self.suffix) and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # NOTE removed by another process
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+
+    def get(self, key):
+        """ returns a 2-tuple of the cached collection and its context or None on a miss
+        """
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                stored_key, collection, context = pickle.load(f)
+        except FileNotFoundError:
+            stored_key = None
+        except Exception as err:
+            l.warning('Could not read cache entry {}: {}'.format(filename, err))
+            stored_key = None
+
+        with self._lock:
+            if stored_key != key:
+                self._misses += 1
+                return None
+            self._hits += 1
+        try:
+            os.utime(filename)  # NOTE the mtime orders entries for eviction
+        except OSError:
+            pass
+        return collection, dict(context)
+
+
+    def put(self, key, collection, context):
+        """ writes collection and its context to disk, evicting least recently used entries to stay under max_bytes
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, collection, dict(context)), f, protocol=pickle.HIGHEST_PROTOCOL)
+            nbytes = os.path.getsize(tmp)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                l.debug('Not caching a collection of {} bytes'.format(nbytes))
+                os.remove(tmp)
+                return
+            os.replace(tmp, self._filename(key))
+        except Exception as err:
+            l.warning('Could not write cache entry: {}'.format(err))
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._evict()
+
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        with self._lock:
+            for _, size, filename in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(filename)
+                    self._evictions += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+    def clear(self):
+        for _, _, filename in self._files():
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
+
+
+    def __len__(self):
+        return len(self._files())
+
+
+    def stats(self):
+        """ returns a dictionary of hits, misses, evictions, the number of entries and their bytes on disk
+        """
+        files = self._files()
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                'entries': len(files), 'nbytes': sum(size for _, size, _ in files)}
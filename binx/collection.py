@@ -4,15 +4,32 @@
 import abc
 import pandas as pd
 import numpy as np
-import copy
+import copyreg
+import datetime
+import re
+import functools
+import io
+import sys
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 
 from marshmallow import Schema, post_load, fields
 from marshmallow.exceptions import ValidationError
+from marshmallow.utils import missing as ma_missing
 
-from .exceptions import InternalNotDefinedError, CollectionLoadError, CollectionValidationError, AdapterChainError
-from .registry import register_collection, get_class_from_collection_registry, adapter_path
+from .exceptions import InternalNotDefinedError, CollectionLoadError, CollectionValidationError, AdapterChainError, \
+    RegistryError
+from .registry import register_collection, get_class_from_collection_registry, adapter_path, register_internal, \
+    get_internal_from_registry
 from .utils import DataFrameDtypeConversion, RecordUtils
+from .storage import ColumnStore
+from .compiler import CompiledSerializer
+from .columnar import DataFrameLoader, ColumnarFallback, can_load_columnar, columns_to_internals, format_resolution
+from .adapter import AdapterPlan, FanOutPlan, AdapterOutputContainer
+from .executor import run_plan, get_default_executor, SerialExecutor
+from .cache import get_default_cache, copy_collection, context_hash
+from .fingerprint import Fingerprint
+from .arrow import import_pyarrow, collection_to_arrow, arrow_to_dataframe
 
 import logging
 l = logging.getLogger(__name__)
@@ -21,11 +38,13 @@ l = logging.getLogger(__name__)
 
 # a place for the registry of internals after they are constructed
 
-class InternalObject(object):
+class InternalObject(object, metaclass=abc.ABCMeta):
     """ a namespace class for instance checking for an internally used model object
     It is otherwise a normal python object. _Internals are used as medium for
     serialization and deserialization and their declarations bound with Collections and enforced by Serializers.
     It can be inherited from or used as a Mixin.
+    Compact internals built by the CollectionBuilder do not inherit from this class, since that would give them
+    an instance __dict__, but are registered as virtual subclasses so isinstance checks still pass.
     """
     is_binx_internal = True
     registered_colls = set()   #NOTE these are collections. A coll's metaclass hook appends any collection objects here
@@ -33,14 +52,83 @@ class InternalObject(object):
     def __init__(self, *args, **kwargs):
         self.__dict__.update(kwargs)
 
+    @classmethod
+    def from_dict(cls, data):
+        """ instantiates the internal from a dictionary of loaded field values. Used by BaseSerializer.load_object.
+        Compact internals built by the CollectionBuilder override this to avoid the kwargs copy
+        """
+        return cls(**data)
+
+class CompactInternalObject(object):
+    """ the base of compact internals built by the CollectionBuilder. It has empty __slots__ so its subclasses
+    only have the slots of their fields and no instance __dict__
+    """
+    __slots__ = ()
+    is_binx_internal = True
+    registered_colls = InternalObject.registered_colls
+
+
+class BuiltInternalMeta(abc.ABCMeta):
+    """ metaclass of the internals made by the CollectionBuilder. These classes can not be found by module and
+    name so they are pickled by their key in binx.registry. A process that does not have the key rebuilds the class
+    from its field names and registers it under the same key.
+    """
+
+
+def _restore_internal_class(key, name, args, compact):
+    try:
+        return get_internal_from_registry(key)
+    except RegistryError:
+        builder = CollectionBuilder()
+        if compact:
+            klass = builder._make_compact_class(name, args, base_class=InternalObject)
+        else:
+            klass = builder._make_dynamic_class(name, args, base_class=InternalObject)
+        return builder._register_internal(klass, args, compact, key=key)
+
+
+def _reduce_internal_class(cls):
+    if '_binx_key' not in vars(cls):
+        return cls.__qualname__   # a declared subclass of a built internal is pickled by reference as usual
+    return _restore_internal_class, (cls._binx_key, cls.__name__, cls._binx_fields, cls._binx_compact)
+
+copyreg.pickle(BuiltInternalMeta, _reduce_internal_class)
+
+
+def _load_partition(serializer_class, internal_class, ma_kwargs, columnar, records):
+    """ validates a partition of records in a worker process for BaseCollection.load_data. Returns a 2-tuple
+    of a success flag and either the internals, a 3-tuple of the length, columns and absent masks of a ColumnStore
+    or the ValidationError messages
+    """
+    serializer = serializer_class(internal=internal_class, **ma_kwargs)
+    try:
+        valid = serializer.load(records, many=True)
+    except ValidationError as err:
+        return False, err.messages
+
+    if columnar:
+        store = ColumnStore(serializer, internal_class)
+        store.extend(valid)
+        columns = {}
+        for name, (arr, mask) in store.columns().items():
+            columns[name] = (arr, np.zeros(len(arr), dtype=bool) if mask is None else mask)
+        return True, (len(store), columns, store.absent_masks())
+    return True, valid
+
+
 class BaseSerializer(Schema):
     """The BaseSerializer overrides Schema to include a internal to dump associated InternalObjects.
     These are instantiated with the serializer and used for loading and validating data.
     It also provides a mapping of numpy dtypes to a select amount of marshmallow field name which helps optimize
     memory in the to_dataframe object
+
+    If compiled is set to True on a subclass, load and dump with many=True use functions generated by
+    binx.compiler the first time the serializer is used. Records that fail in the compiled path are re-run
+    through marshmallow so results and ValidationErrors are the same either way.
     """
 
     registered_colls = set()
+    compiled = False
 
     numpy_map = {
 
@@ -63,6 +151,44 @@ class BaseSerializer(Schema):
             raise InternalNotDefinedError('An InternalObject class must be instantiated with this Collection')
         super().__init__(*args, **kwargs)
         self.dateformat_fields = self._set_dateformat_fields()
+        self._compiled = None
+        self._numpy_fields = None
+
+
+    def _get_compiled(self):
+        """ lazily compiles the load and dump functions for this instance
+        """
+        if self._compiled is None:
+            self._compiled = CompiledSerializer(self)
+        return self._compiled
+
+
+    def load(self, data, *, many=None, partial=None, unknown=None):
+        """ overrides Schema.load to use the compiled fast path if compiled is set
+        """
+        many = self.many if many is None else bool(many)
+        if self.compiled and many and partial is None and unknown is None and isinstance(data, (list, tuple)):
+            compiled_load = self._get_compiled().load
+            if compiled_load is not None:
+                try:
+                    return compiled_load(data)
+                except Exception:
+                    pass  # NOTE fall through to marshmallow for identical results and error messages
+        return super().load(data, many=many, partial=partial, unknown=unknown)
+
+
+    def dump(self, obj, *, many=None):
+        """ overrides Schema.dump to use the compiled fast path if compiled is set
+        """
+        many = self.many if many is None else bool(many)
+        if self.compiled and many and hasattr(obj, '__len__'):
+            compiled_dump = self._get_compiled().dump
+            if compiled_dump is not None:
+                try:
+                    return compiled_dump(obj)
+                except Exception:
+                    pass
+        return super().dump(obj, many=many)
 
 
     def _set_dateformat_fields(self):
@@ -86,18 +212,23 @@ class BaseSerializer(Schema):
     @post_load
     def load_object(self, data, **kwargs):
         """ loads and validates an internal class object """
+        from_dict = getattr(self._InternalClass, 'from_dict', None)
+        if from_dict is not None:
+            return from_dict(data)
         return self._InternalClass(**data)
 
 
     def get_numpy_fields(self):
         """ returns a dictionary of column names and numpy dtypes based on the ma_np_map dictionary.
-        Collections will use this to create more mem-optimized dataframes
+        Collections will use this to create more mem-optimized dataframes. The map is built once per instance
         """
-        out = {}
-        for field_name in self._declared_fields.keys():
-            ma_klass = self.__class__._declared_fields[field_name]
-            out[field_name] = self.numpy_map.get(type(ma_klass)) or np.dtype('O')
-        return out
+        if self._numpy_fields is None:
+            out = {}
+            for field_name in self._declared_fields.keys():
+                ma_klass = self.__class__._declared_fields[field_name]
+                out[field_name] = self.numpy_map.get(type(ma_klass)) or np.dtype('O')
+            self._numpy_fields = out
+        return dict(self._numpy_fields)
 
 
 class CollectionMeta(type):
@@ -110,6 +241,31 @@ class CollectionMeta(type):
 # compose a mixed Metaclass that registers and provides an abstract interface
 AbstractCollectionMeta = type('AbstractCollectionMeta', (abc.ABC, CollectionMeta), {})
 
+
+def _restore_collection_class(fullpath, name, serializer_class, internal_class, built):
+    try:
+        return get_class_from_collection_registry(fullpath)[0]
+    except RegistryError:
+        if not built:
+            raise
+        return CollectionBuilder()._make_collection_class(name, serializer_class, internal_class)
+
+
+def _reduce_collection_class(cls):
+    """ collection classes that can be imported are pickled by reference as usual. Others, such as the ones
+    made by the CollectionBuilder, are found in the collection registry by their fully qualified path. Built
+    classes that are not in the registry are rebuilt from their serializer and internal classes
+    """
+    obj = sys.modules.get(cls.__module__)
+    for part in cls.__qualname__.split('.'):
+        obj = getattr(obj, part, None)
+    if obj is cls:
+        return cls.__qualname__
+    return _restore_collection_class, (cls.get_fully_qualified_class_path(), cls.__name__, cls.serializer_class,
+        cls.internal_class, vars(cls).get('_binx_built', False))
+
+copyreg.pickle(AbstractCollectionMeta, _reduce_collection_class)
+
 class AbstractCollection(object, metaclass=AbstractCollectionMeta):
     """Defines an interface for Collection objects. This includes a valid marshmallow
     serializer class, a data list object iterablem, load_data method with validation.
@@ -166,10 +322,21 @@ class BaseCollection(AbstractCollection):
     Subclasses will mostly just need to define a custom Serializer and InternalObject pair
 
     :param data: the data being passed into the serializer, could be a dataframe or list of records. If None
+    :param columnar: if True the internals are kept in a binx.storage.ColumnStore, one numpy array per field,
+        instead of a list of InternalObjects. If None the class level columnar attribute is used.
+    :param cache_data: if True the dumped records returned by the data property are memoized until the
+        collection is mutated. Callers that mutate the list returned by data should set this to False.
+        If None the class level cache_data attribute is used.
+
+    load_data and load_stream take an optional workers argument that validates the records in partitions on a
+    ProcessPoolExecutor. The serializer_class and internal_class must be picklable. Internals made by the
+    CollectionBuilder are.
 
     """
     serializer_class = BaseSerializer   # must be overridden with a valid marshmallow schema and _Internal
     internal_class = InternalObject
+    columnar = False
+    cache_data = True
 
     def __new__(cls, *args, **kwargs):
         cls.serializer_class.registered_colls.add(cls)  # register the cls here
@@ -178,13 +345,34 @@ class BaseCollection(AbstractCollection):
         return inst
 
 
-    def __init__(self, data=None, **ma_kwargs):
-        self._data = []
+    def __init__(self, data=None, columnar=None, cache_data=None, **ma_kwargs):
         self._serializer = self.serializer_class(internal=self.__class__.internal_class, **ma_kwargs)
+        self._ma_kwargs = ma_kwargs
+        if columnar is None:
+            columnar = self.__class__.columnar
+        self._data = ColumnStore(self._serializer, self.__class__.internal_class) if columnar else []
+        self.cache_data = self.__class__.cache_data if cache_data is None else cache_data
+        self._data_cache = None
+        self._lineage = uuid.uuid4().hex
         if data is not None:
             self.load_data(data)
         self.__collection_id = uuid.uuid4().hex
 
+    def __getstate__(self):
+        """ collections are pickled with their internals or ColumnStore. The serializer is rebuilt when unpickled
+        """
+        state = self.__dict__.copy()
+        for key in ('_serializer', '_data_cache', '_iter', '_fingerprint'):
+            state.pop(key, None)
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._serializer = self.serializer_class(internal=self.__class__.internal_class, **self._ma_kwargs)
+        self._data_cache = None
+
+
     @classmethod
     def get_fully_qualified_class_path(cls):
         """ This returns the fully qualified class name for this class. This can be used for collection_registry lookup
@@ -206,11 +394,25 @@ class BaseCollection(AbstractCollection):
 
     @property
     def data(self):
-        """ returns an object-representation of the metadata using the serializer
+        """ returns an object-representation of the metadata using the serializer. If cache_data is set
+        the dumped records are memoized and the same list is returned until the collection is mutated.
         """
         if len(self._data) == 0:
-            return self._data
-        return self.serializer.dump(self._data, many=True) # changed to update ma v3
+            return []
+        if self.cache_data and self._data_cache is not None:
+            return self._data_cache
+
+        dumped = self.serializer.dump(self._data, many=True) # changed to update ma v3
+        if self.cache_data:
+            self._data_cache = dumped
+        return dumped
+
+
+    def invalidate_data_cache(self):
+        """ drops the memoized records returned by the data property. This is called by load_data and
+        should be called by anything else that mutates the internals directly
+        """
+        self._data_cache = None
 
 
     @property
@@ -223,17 +425,29 @@ class BaseCollection(AbstractCollection):
     def collection_id(self):
         return self.__collection_id
 
+    @property
+    def watermark(self):
+        """ returns a 2-tuple of a lineage token and the number of rows. load_data only appends, so while the token
+        is unchanged the first rows up to an earlier watermark are the same. Copies made by the adapter caches get
+        a new token
+        """
+        return getattr(self, '_lineage', None), len(self._data)
+
+
+    @property
+    def is_columnar(self):
+        """ True if the internals are stored in a ColumnStore
+        """
+        return isinstance(self._data, ColumnStore)
+
 
     def __iter__(self):
-        self._idx = 0
+        self._iter = iter(self._data)
         return self
 
 
     def __next__(self):
-        self._idx += 1
-        if self._idx > len(self._data):
-            raise StopIteration
-        return self._data[self._idx-1]
+        return next(self._iter)
 
 
     def __len__(self):
@@ -254,40 +468,64 @@ class BaseCollection(AbstractCollection):
             raise TypeError('Only Collections of the same class can be concatenated')
 
     @classmethod
-    def _resolve_adapter_chain(cls, input_collection, accumulate, **adapter_context):
-        """ attempts to resolve the adapter chain using the current class as the target and
-        input as the starting class. The adapter context accumulates over each call and ensures that
-        kwargs needed for certain adapter calls are guaranteed to make it to the correct adapter.
+    def plan_from(cls, from_collection_class, cost='hops'):
+        """ resolves the adapter chain from from_collection_class to this class and returns an AdapterPlan. The plan
+        holds validated adapter instances and can be called many times with input collections and context,
+        skipping the path search and adapter setup that adapt does on each call.
+        plan = CollectionB.plan_from(CollectionA)
+        output = plan(colla, some_var=42)
+        collb, context = output.collection, output.context
+
+        cost is the routing policy passed to binx.registry.adapter_path. raises an AdapterChainError if there is no path
+        """
+        adapters = adapter_path(from_collection_class, cls, cost=cost)
+        if len(adapters) == 0:
+            raise AdapterChainError('The input_collection {} could not be found on the adapter chain for {}'.format(
+                from_collection_class.__name__, cls.__name__))
+        return AdapterPlan(from_collection_class, cls, adapters)
 
-        returns the final AdapterOutputContainer with accumulated context or None if there are no adapters in the adapter chain
-        This raises an AdapterChainError in adapt
+
+    @classmethod
+    def _get_adapter_plan(cls, input_collection, cost='hops', **adapter_context):
+        """ returns an AdapterPlan from the input collection's class to this class or None if there is no path
         """
-        adapters = adapter_path(input_collection.__class__, cls)
+        adapters = adapter_path(input_collection.__class__, cls, cost=cost)
         if len(adapters) == 0:  # return an empty list if no adapters can be found
             return
         try:
-
-            current_context = adapter_context  # set starting point... these are instances and will be modified below
-            current_input = input_collection  # NOTE this is an instance with data to be transformed.. not a class
-            adapter_output = None
-
-            for i, adapter_class in enumerate(adapters):
-                # if accumulate make a new key in the current context for the current collection the collection name in the registry
-                if accumulate and i > 0:
-                    coll_id = current_input.__class__.__name__
-                    current_context[coll_id] = copy.copy(current_input)
-
-                current_adapter = adapter_class() # for each adapter class we push the input_collection and a context
-                adapter_output = current_adapter(current_input, **current_context) # adapt data to the next type of collection
-                current_context = {**current_context, **adapter_output.context} # NOTE this is will fail on py3.4
-                current_input = adapter_output.collection
-
+            return AdapterPlan(input_collection.__class__, cls, adapters)
         except Exception as err:
             e = AdapterChainError('An error occurred within the adapter chain')
-            e.context = current_context
+            e.context = adapter_context
             raise e from err
 
-        adapter_output._context = current_context # set final context
+
+    @classmethod
+    def _resolve_adapter_chain(cls, input_collection, accumulate, cost='hops', executor=None, cache=None,
+            **adapter_context):
+        """ attempts to resolve the adapter chain using the current class as the target and
+        input as the starting class. The adapter context accumulates over each call and ensures that
+        kwargs needed for certain adapter calls are guaranteed to make it to the correct adapter.
+
+        returns the final AdapterOutputContainer with accumulated context or None if there are no adapters in the adapter chain
+        This raises an AdapterChainError in adapt
+        """
+        plan = cls._get_adapter_plan(input_collection, cost=cost, **adapter_context)
+        if plan is None:
+            return
+
+        cache = get_default_cache() if cache is None else cache
+        key = None if cache is None else cache.make_key(input_collection, plan, accumulate, adapter_context)
+        if key is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                adapter_output = AdapterOutputContainer(hit[0])
+                adapter_output._context = hit[1]
+                return adapter_output
+
+        adapter_output = run_plan(plan, input_collection, accumulate=accumulate, executor=executor, **adapter_context)
+        if key is not None:
+            cache.put(key, adapter_output.collection, adapter_output.context)
         return adapter_output
 
 
@@ -319,6 +557,114 @@ class BaseCollection(AbstractCollection):
         return df
 
 
+    _iso_layout = re.compile(r'^%Y-%m-%d([ T]%H(:%M(:%S(\.%f)?)?)?)?$')
+
+    def _date_resolution(self, field):
+        """ returns the resolution a date or datetime field keeps when it is dumped and parsed back by pandas, 'iso'
+        if values are kept as is, or None if the values have to be dumped. Only year-first layouts are truncated
+        here since pandas may parse other layouts day and month first
+        """
+        data_format = field.format
+        if data_format in (None, 'iso', 'iso8601'):
+            return 'D' if isinstance(field, fields.Date) else 'iso'
+        if not self._iso_layout.match(data_format):
+            return None
+        return 'D' if isinstance(field, fields.Date) else format_resolution(data_format)
+
+
+    def _dataframe_from_internals(self, internals):
+        """ builds a dataframe directly from a list of internals. The result is the same as dumping them and
+        passing the records to _dataframe_with_dtypes, but only fields that have no numpy dtype (lists, dicts, nested
+        and custom fields) are serialized value by value. Dates are truncated to their format's resolution rather
+        than being written to strings and parsed back
+        """
+        if len(internals) == 0:
+            return pd.DataFrame()
+
+        dtype_map = self.serializer.get_numpy_fields()
+        missing = object()
+
+        df_data = {}
+        for name, field in self.serializer.dump_fields.items():
+            col = field.data_key if field.data_key is not None else name
+            if col not in dtype_map:
+                continue    # NOTE the record path only finds columns under a declared field name
+            dtype = dtype_map[col]
+
+            attr = field.attribute or name
+            if dtype.kind == 'O' or getattr(field, 'as_string', False):
+                values = [field.serialize(name, obj) for obj in internals]
+                values = [missing if v is ma_missing else v for v in values]
+            elif '.' in attr:
+                values = [field.get_value(obj, name) for obj in internals]
+                values = [missing if v is ma_missing else v for v in values]
+            else:
+                values = [getattr(obj, attr, missing) for obj in internals]
+
+            absent = [v is missing for v in values]
+            if all(absent):
+                l.warning('Creating df without non-required field {}'.format(col))
+                continue
+            if any(absent):
+                values = [None if a else v for a, v in zip(absent, values)]
+
+            has_none = any(v is None for v in values)
+            if dtype.kind == 'M':
+                resolution = self._date_resolution(field)
+                naive = all(v is None or (isinstance(v, datetime.date) and getattr(v, 'tzinfo', None) is None)
+                    for v in values)
+                if resolution is None or not naive:
+                    values = [None if v is None else field._serialize(v, name, None) for v in values]
+                    series = pd.Series(values, dtype=dtype)
+                else:
+                    series = pd.Series(values, dtype=dtype)
+                    if resolution != 'iso':
+                        series = series.dt.floor(resolution)
+            else:
+                if dtype == np.dtype('int') and has_none:
+                    dtype = None    # NOTE should coerce an int to a float if there are nans
+                series = pd.Series(values, dtype=dtype)
+                if has_none and series.dtype.kind == 'O':
+                    series = series.fillna(value=np.nan)   # same as df_none_to_nan
+            df_data[col] = series
+
+        return pd.DataFrame(df_data)
+
+
+    def _dataframe_from_columns(self, store, start=0, stop=None):
+        """ builds a dataframe directly from the arrays in a ColumnStore, optionally for the rows from start to stop.
+        Nulls are handled the same way as _dataframe_with_dtypes... ints with nulls are coerced to float, dates to
+        NaT and objects to NaN
+        """
+        stop = len(store) if stop is None else min(stop, len(store))
+        if stop <= start:
+            return pd.DataFrame()
+
+        df_data = {}
+        for col, (arr, mask) in store.columns().items():
+            arr = arr[start:stop]
+            mask = None if mask is None else mask[start:stop]
+            absent = store.absent(col)
+            if mask is not None and mask.any():
+                if mask.all() and (not store._allow_none[col] or absent is not None and absent[start:stop].all()):
+                    l.warning('Creating df without non-required field {}'.format(col))
+                    continue
+                if arr.dtype.kind in ('i', 'u'):
+                    arr = arr.astype('float')
+                    arr[mask] = np.nan
+                elif arr.dtype.kind == 'M':
+                    arr = arr.copy()
+                    arr[mask] = np.datetime64('NaT')
+                elif arr.dtype.kind in ('O', 'U'):  # NOTE strings are unicode arrays in a store opened by from_npy
+                    arr = arr.astype('O')
+                    arr[mask] = None
+                    df_data[col] = pd.Series(arr).fillna(value=np.nan)  # same inference as df_none_to_nan
+                    continue
+            df_data[col] = pd.Series(arr, copy=False)
+
+        return pd.DataFrame(df_data)
+
+
     def _clean_dataframe(self, df):
         """ cleans and converts formats on a dataframe
         """
@@ -333,6 +679,25 @@ class BaseCollection(AbstractCollection):
         records = df.to_dict('records')
         return records
 
+    def _load_dataframe_columnar(self, df):
+        """ validates and appends a dataframe column by column with binx.columnar. Returns False if
+        the frame has to go through the record path instead
+        """
+        if not can_load_columnar(self.serializer):
+            return False
+        try:
+            length, columns = DataFrameLoader(self.serializer).load(df)
+        except ColumnarFallback as err:
+            l.debug('Loading dataframe through records: {}'.format(err))
+            return False
+
+        if self.is_columnar:
+            self._data.extend_columns(columns, length)
+        else:
+            self._data += columns_to_internals(columns, length, self.serializer)
+        return True
+
+
     def _clean_records(self, records):
         formatfields = self.serializer.dateformat_fields
         util = RecordUtils()
@@ -342,23 +707,161 @@ class BaseCollection(AbstractCollection):
         return records
 
 
-    def load_data(self, records, raise_on_empty=False):
+    def _load_parallel(self, records, workers, partition_size=None, pool=None):
+        """ validates the records in partitions on a process pool and appends the results in their original
+        order. Nothing is appended if any partition fails. The ValidationError that is raised has the messages of
+        every partition keyed by their row in records, same as a serial load. A new pool is started unless one
+        is passed in
+        """
+        if partition_size is None:
+            partition_size = max(1, -(-len(records) // (workers * 4)))   # a few partitions per worker to balance load
+        offsets = range(0, len(records), partition_size)
+        partitions = [records[i:i + partition_size] for i in offsets]
+
+        load = functools.partial(_load_partition, self.serializer_class, self.__class__.internal_class,
+            self._ma_kwargs, self.is_columnar)
+        if pool is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(load, partitions))
+        else:
+            results = list(pool.map(load, partitions))
+
+        errors = {}
+        for offset, (ok, result) in zip(offsets, results):
+            if not ok:
+                errors.update({offset + k if isinstance(k, int) else k: v for k, v in result.items()})
+        if len(errors) > 0:
+            raise ValidationError(errors)
+
+        for ok, result in results:
+            if self.is_columnar:
+                length, columns, absent = result
+                self._data.extend_columns(columns, length, absent=absent)
+            else:
+                self._data += result
+
+
+    _conformant_types = [   # NOTE checked in order since Date subclasses DateTime and Integer accepts bools
+        (fields.Boolean, (bool,), 'b'),
+        (fields.Integer, (int,), 'iu'),
+        (fields.Float, (int, float), 'iuf'),
+        (fields.String, (str,), 'O'),
+        (fields.Date, (datetime.date,), 'M'),
+        (fields.DateTime, (datetime.datetime,), 'M'),
+        (fields.List, (list, tuple), 'O'),
+        (fields.Dict, (dict,), 'O'),
+    ]
+
+    def _conformant_checks(self):
+        """ returns a list of (data key, allowed python types, allowed dtype kinds, allow_none, required) for
+        the load fields that _load_unvalidated can type check
+        """
+        checks = []
+        for name, field in self.serializer.load_fields.items():
+            for field_class, types, kinds in self._conformant_types:
+                if isinstance(field, field_class):
+                    key = field.data_key if field.data_key is not None else name
+                    checks.append((key, types, kinds, field.allow_none, field.required))
+                    break
+        return checks
+
+
+    def _load_unvalidated(self, records):
+        """ appends records that are known to conform to the serializer without running marshmallow. records can
+        be a list of internals, a list of dicts of loaded values or a DataFrame with typed columns.
+        Dicts and DataFrames get a cheap type and null check per column. Returns False without loading anything if
+        they do not pass it, for example dates that are still strings from a dump, so that the caller can validate
+        them
+        """
+        checks = self._conformant_checks()
+
+        if isinstance(records, pd.DataFrame):
+            for key, _, kinds, allow_none, required in checks:
+                if key not in records.columns:
+                    if required:
+                        return False
+                elif records[key].dtype.kind not in kinds or (not allow_none and records[key].isna().any()):
+                    return False
+            columns = {}
+            for name, field in self.serializer.load_fields.items():
+                key = field.data_key if field.data_key is not None else name
+                if key in records.columns:
+                    columns[name] = (np.asarray(records[key]), np.asarray(records[key].isna()))
+            if self.is_columnar:
+                self._data.extend_columns(columns, len(records))
+            else:
+                self._data += columns_to_internals(columns, len(records), self.serializer)
+            return True
+
+        internal_class = self.__class__.internal_class
+        records = list(records)
+        absent = object()
+        for key, types, _, allow_none, required in checks:
+            for record in records:
+                if isinstance(record, internal_class):
+                    continue
+                value = record.get(key, absent)
+                if value is absent:
+                    if required:
+                        return False
+                elif value is None:
+                    if not allow_none:
+                        return False
+                elif not isinstance(value, types) or (types == (int,) and isinstance(value, bool)) or \
+                        (types == (datetime.date,) and isinstance(value, datetime.datetime)):
+                    return False
+
+        make_internal = getattr(internal_class, 'from_dict', None) or (lambda d: internal_class(**d))
+        keys = [(field.data_key if field.data_key is not None else name, field.attribute or name)
+            for name, field in self.serializer.load_fields.items()]
+
+        internals = []
+        for record in records:
+            if isinstance(record, internal_class):
+                internals.append(record)
+            else:
+                internals.append(make_internal({attr: record[key] for key, attr in keys if key in record}))
+        self._data += internals
+        return True
+
+
+    def load_data(self, records, raise_on_empty=False, workers=None, partition_size=None, validate=True, pool=None):
         """default implementation. Defaults to handling lists of python-dicts (records).
+        If workers is greater than 1 the records are validated in partitions of partition_size on a process pool
+        with that many workers. DataFrames that can be validated column by column do not use the pool. pool is an
+        optional ProcessPoolExecutor to use instead of starting one for this call.
+        If validate is False the records are trusted to be schema-conformant and marshmallow is skipped. This is
+        used for intermediate collections in adapter chains. Records whose values are not of the field types are
+        validated anyway.
         #TODO -- create a drop_duplicates option and use pandas to drop the dupes
         """
         try:
             if raise_on_empty and len(records) == 0:
                 raise ValueError('An empty set of records was passed to load_data')
 
+            if not validate:
+                if self._load_unvalidated(records):
+                    self.invalidate_data_cache()
+                    return
+                l.debug('Records for {} are not schema-conformant and will be validated'.format(
+                    self.__class__.__name__))
+
             if isinstance(records, pd.DataFrame):
+                if self._load_dataframe_columnar(records):
+                    self.invalidate_data_cache()
+                    return
                 records = self._clean_dataframe(records)
             else:
                 records = self._clean_records(records)
 
             # append to the data dictionary
             # NOTE changing this to handle tuples in marsh 2.x
-            valid = self.serializer.load(records, many=True)
-            self._data += valid
+            if workers is not None and workers > 1:
+                self._load_parallel(list(records), workers, partition_size, pool=pool)
+            else:
+                valid = self.serializer.load(records, many=True)
+                self._data += valid
+            self.invalidate_data_cache()
 
         except TypeError as err:
             raise CollectionLoadError('A Serializer must be instantiated with valid fields') from err
@@ -372,8 +875,71 @@ class BaseCollection(AbstractCollection):
             raise CollectionLoadError('An error occurred while loading and validating records') from err
 
 
+    def _iter_chunks(self, records, chunksize):
+        """ groups an iterable of records into lists of at most chunksize. DataFrames in the iterable are
+        passed through as their own chunk
+        """
+        chunk = []
+        for record in records:
+            if isinstance(record, pd.DataFrame):
+                if len(chunk) > 0:
+                    yield chunk
+                    chunk = []
+                yield record
+                continue
+            chunk.append(record)
+            if len(chunk) == chunksize:
+                yield chunk
+                chunk = []
+        if len(chunk) > 0:
+            yield chunk
+
+
+    def load_stream(self, records, chunksize=10000, workers=None):
+        """ validates and appends any iterable or generator of records in chunks of chunksize using load_data.
+        Only one chunk is held in memory at a time. DataFrames yielded by the iterable, for instance from
+        pd.read_csv(..., chunksize=n), are loaded as their own chunk. Returns the number of rows loaded.
+
+        Chunks loaded before a failing chunk stay in the collection. The CollectionValidationError or
+        CollectionLoadError that is raised has a chunk attribute with the index of the failed chunk and an offset
+        attribute with the row offset of its first record in the stream. CollectionValidationErrors also have an
+        errors attribute with the marshmallow messages keyed by row offset in the stream.
+        If workers is greater than 1 one process pool is started and shared by every chunk.
+        """
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer')
+
+        if workers is not None and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return self._load_stream(records, chunksize, workers, pool)
+        return self._load_stream(records, chunksize, workers, None)
+
+
+    def _load_stream(self, records, chunksize, workers, pool):
+        offset = 0
+        for i, chunk in enumerate(self._iter_chunks(records, chunksize)):
+            try:
+                self.load_data(chunk, workers=workers, pool=pool)
+            except CollectionValidationError as err:
+                messages = err.__cause__.messages if isinstance(err.__cause__, ValidationError) else {}
+                e = CollectionValidationError('A ValidationError occurred in chunk {} at row offset {} while trying to load {}'.format(
+                    i, offset, self.__class__.__name__))
+                e.chunk = i
+                e.offset = offset
+                e.errors = {offset + k if isinstance(k, int) else k: v for k, v in messages.items()} if isinstance(messages, dict) else messages
+                raise e from err
+            except CollectionLoadError as err:
+                e = CollectionLoadError('An error occurred in chunk {} at row offset {} while loading and validating records'.format(i, offset))
+                e.chunk = i
+                e.offset = offset
+                raise e from err
+            offset += len(chunk)
+
+        return offset
+
+
     @classmethod
-    def adapt(cls, input_collection, accumulate=False, **adapter_context):
+    def adapt(cls, input_collection, accumulate=False, cost='hops', executor=None, cache=None, **adapter_context):
         """ Attempts to adapt the input collection instance into a collection of this type by
         resolving the adapter chain for the input collection. Any kwargs passed in are handed over to the resolver.
         colla = CollectionA()
@@ -382,12 +948,24 @@ class BaseCollection(AbstractCollection):
 
 
         This method returns a new instance of the adapted class (the caller)
+
+        cost chooses how the route is planned. 'hops' takes the fewest adapters, 'static' the lowest sum of declared
+        adapter costs and 'measured' prefers the recorded seconds per row of adapters that set measure_cost
+
+        executor is any concurrent.futures.Executor, such as those in binx.executor, that the chain is run on as a
+        single task. If None the default from binx.executor.set_default_executor is used, and if that is not set
+        the chain runs inline
+
+        cache is a binx.cache.AdapterCache or DiskAdapterCache, or the default from binx.cache.set_default_cache if
+        None. Results of chains where every adapter is cacheable are memoized by the input's fingerprint, the route
+        and the context. Hits from a DiskAdapterCache are unpickled without validating them again
         """
 
         if not issubclass(input_collection.__class__, BaseCollection): #check if its a Collection or raise TypeError
             raise TypeError('The input to adapt must be a Collection')
 
-        adapted = cls._resolve_adapter_chain(input_collection, accumulate, **adapter_context) # attempt to resolve the adapter chain
+        adapted = cls._resolve_adapter_chain(input_collection, accumulate, cost=cost, executor=executor, cache=cache,
+            **adapter_context) # attempt to resolve the adapter chain
 
         if adapted is not None:
             return adapted.collection, adapted.context # on success we return the new collection and the accumulated context for reference
@@ -396,18 +974,289 @@ class BaseCollection(AbstractCollection):
                 input_collection.__class__.__name__, cls.__name__))
 
 
+    @classmethod
+    def adapt_incremental(cls, input_collection, previous=None, accumulate=False, cost='hops', executor=None,
+            **adapter_context):
+        """ adapts input_collection like adapt, but reuses previous, the collection returned by an earlier
+        adapt_incremental call, when the input has only grown since then.
+        coll_b, context = CollectionB.adapt_incremental(coll_a)
+        coll_a.load_data(new_records)
+        coll_b, context = CollectionB.adapt_incremental(coll_a, previous=coll_b)
+
+        Only rows past the input's watermark at the earlier call are adapted and appended to a copy of previous.
+        This requires every adapter on the route to be rowwise and the same route and context as before. Otherwise
+        the whole input is adapted again. previous is not changed. The returned context is the context of the earlier
+        call updated with the keys returned by adapting the new rows
+        """
+        if not issubclass(input_collection.__class__, BaseCollection):
+            raise TypeError('The input to adapt must be a Collection')
+
+        plan = cls._get_adapter_plan(input_collection, cost=cost, **adapter_context)
+        if plan is None:
+            raise AdapterChainError('The input_collection {} could not be found on the adapter chain for {}'.format(
+                input_collection.__class__.__name__, cls.__name__))
+
+        lineage, length = input_collection.watermark
+        digest = context_hash(adapter_context)
+        key = (lineage, tuple(adapter.__class__ for adapter in plan.adapters), bool(accumulate), digest)
+        state = getattr(previous, '_delta_state', None)
+        rowwise = all(getattr(adapter, 'rowwise', False) for adapter in plan.adapters)
+
+        if rowwise and lineage is not None and digest is not None and state is not None and state[0] == key \
+                and state[1] <= length:
+            output = copy_collection(previous)
+            if state[1] == length:
+                context = dict(state[2])
+            else:
+                l.debug('Adapting rows {} to {} of {}'.format(state[1], length, input_collection.__class__.__name__))
+                delta = run_plan(plan, input_collection._tail(state[1]), accumulate=accumulate, executor=executor,
+                    **adapter_context)
+                output._append_collection(delta.collection)
+                context = dict(state[2])
+                context.update(delta.context)
+        else:
+            adapted = run_plan(plan, input_collection, accumulate=accumulate, executor=executor, **adapter_context)
+            output, context = adapted.collection, adapted.context
+
+        output._delta_state = (key, length, dict(context))
+        return output, context
+
+
+    def _tail(self, start):
+        """ returns a new collection of the rows from start onwards. The internals or arrays are shared
+        """
+        tail = self.__class__(columnar=self.is_columnar, cache_data=self.cache_data, **self._ma_kwargs)
+        if self.is_columnar:
+            columns = {}
+            for name, (arr, mask) in self._data.columns().items():
+                columns[name] = (arr[start:], np.zeros(len(arr) - start, dtype=bool) if mask is None else mask[start:])
+            absent = {name: mask[start:] for name, mask in self._data.absent_masks().items()}
+            tail._data.extend_columns(columns, len(self._data) - start, absent=absent)
+        else:
+            tail._data = self._data[start:]
+        return tail
+
+
+    def _append_collection(self, other):
+        """ appends the already validated rows of other, a collection of the same class
+        """
+        if self.is_columnar and other.is_columnar:
+            columns = {}
+            for name, (arr, mask) in other._data.columns().items():
+                columns[name] = (arr, np.zeros(len(arr), dtype=bool) if mask is None else mask)
+            self._data.extend_columns(columns, len(other), absent=other._data.absent_masks())
+        else:
+            self._data += list(other._data)
+        self.invalidate_data_cache()
+
+
+    def adapt_many(self, target_collection_classes, executor=None, accumulate=False, cost='hops', **adapter_context):
+        """ adapts this collection into each of the target classes with a binx.adapter.FanOutPlan. Intermediate
+        collections shared by several routes are computed once and independent branches run concurrently if a
+        concurrent.futures executor is given.
+        results = colla.adapt_many([CollectionB, CollectionC], executor=ThreadPoolExecutor(4), some_var=42)
+        collc, context = results[CollectionC]
+
+        returns a dictionary of target classes and (collection, context) tuples
+        """
+        plan = FanOutPlan(self.__class__, target_collection_classes, cost=cost)
+        executor = get_default_executor() if executor is None else executor
+        return plan(self, executor=executor, accumulate=accumulate, **adapter_context)
+
+
+    @classmethod
+    async def aadapt(cls, input_collection, accumulate=False, cost='hops', executor=None, **adapter_context):
+        """ The coroutine version of adapt. AsyncAbstractAdapters in the chain are awaited and all other adapters
+        run in executor, or the event loop's default executor if None. The default from
+        binx.executor.set_default_executor is used unless it is a SerialExecutor, which would block the loop.
+        Returns the same 2-tuple as adapt
+        collc, context = await CollectionC.aadapt(colla, some_var=42)
+        """
+        if not issubclass(input_collection.__class__, BaseCollection):
+            raise TypeError('The input to adapt must be a Collection')
+
+        plan = cls._get_adapter_plan(input_collection, cost=cost, **adapter_context)
+        if plan is None:
+            raise AdapterChainError('The input_collection {} could not be found on the adapter chain for {}'.format(
+                input_collection.__class__.__name__, cls.__name__))
+
+        if executor is None:
+            executor = get_default_executor()
+            if isinstance(executor, SerialExecutor):
+                executor = None   # NOTE a serial default would run sync adapters on the event loop thread
+        adapted = await plan.acall(input_collection, accumulate=accumulate, executor=executor, **adapter_context)
+        return adapted.collection, adapted.context
+
+
     def to_dataframe(self):
-        """ returns a dataframe representation of the object. This wraps the data property in a
-        pd.DataFrame
+        """ returns a dataframe representation of the object. Columns are built directly from the internals
+        or the ColumnStore with the dtypes from the serializer's get_numpy_fields
         converts any columns that can be converted to datetime
         """
-        return self._dataframe_with_dtypes(self.data)
+        if self.is_columnar:
+            return self._dataframe_from_columns(self._data)
+        return self._dataframe_from_internals(self._data)
 
 
-    def to_json(self):
-        """ returns a json string representation of the data using the serializer
+    def iter_dataframes(self, chunksize=10000):
+        """ yields dataframes of at most chunksize rows, in order. Each chunk is built like to_dataframe, so an int
+        column is only coerced to float in the chunks that have nulls. The chunks are indexed by their row positions
+        and pd.concat of all of them has the same values as to_dataframe
+        for df in coll.iter_dataframes(50000):
+            df.to_csv(f, header=f.tell() == 0)
         """
-        return self.serializer.dumps(self._data, many=True)
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer')
+
+        for start in range(0, len(self._data), chunksize):
+            stop = min(start + chunksize, len(self._data))
+            if self.is_columnar:
+                df = self._dataframe_from_columns(self._data, start, stop)
+            else:
+                df = self._dataframe_from_internals(self._data[start:stop])
+            df.index = pd.RangeIndex(start, start + len(df))
+            yield df
+
+
+    def to_json(self, fp=None, lines=False, chunksize=10000):
+        """ returns a json string representation of the data using the serializer. If fp is a file-like object
+        the output is written to it chunksize records at a time instead and None is returned, so memory does not
+        grow with the size of the collection.
+        If lines is True the output is newline-delimited json (NDJSON), one record per line, rather than an array.
+        with open('out.ndjson', 'w') as f:
+            coll.to_json(f, lines=True)
+        """
+        if fp is None and not lines:
+            return self.serializer.dumps(self._data, many=True)
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer')
+
+        out = io.StringIO() if fp is None else fp
+        render = self.serializer.opts.render_module.dumps
+        for start in range(0, len(self._data), chunksize):
+            records = self.serializer.dump(self._data[start:start + chunksize], many=True)
+            if lines:
+                out.write(''.join(render(record) + '\n' for record in records))
+            else:
+                # NOTE separators match dumps of the whole list
+                out.write(('[' if start == 0 else ', ') + ', '.join(render(record) for record in records))
+
+        if not lines:
+            out.write('[]' if len(self._data) == 0 else ']')
+        return out.getvalue() if fp is None else None
+
+
+    def to_npy(self, path):
+        """ writes the collection to the directory path as one .npy file per field and null mask along with a
+        manifest.json. See binx.storage.ColumnStore.save
+        """
+        if self.is_columnar:
+            store = self._data
+        else:
+            store = ColumnStore(self.serializer, self.__class__.internal_class)
+            store.extend(self._data)
+        store.save(path)
+
+
+    @classmethod
+    def from_npy(cls, path, mmap_mode='r', **ma_kwargs):
+        """ returns a columnar collection over the arrays written by to_npy. The arrays are memory-mapped read-only
+        by default and are not validated again. Appending with load_data copies them into memory
+        """
+        coll = cls(columnar=True, **ma_kwargs)
+        try:
+            coll._data = ColumnStore.open(path, coll.serializer, cls.internal_class, mmap_mode=mmap_mode)
+        except (OSError, ValueError, KeyError) as err:
+            raise CollectionLoadError('Could not open the arrays in {} for {}'.format(path, cls.__name__)) from err
+        return coll
+
+
+    def to_arrow(self):
+        """ returns a pyarrow.Table of the collection with a schema derived from the serializer's load fields.
+        Requires pyarrow
+        """
+        return collection_to_arrow(self)
+
+
+    @classmethod
+    def from_arrow(cls, table, columnar=None, **ma_kwargs):
+        """ returns a new collection loaded from a pyarrow.Table. The table is validated column by column like
+        a DataFrame passed to load_data
+        """
+        coll = cls(columnar=columnar, **ma_kwargs)
+        coll.load_data(arrow_to_dataframe(table, coll.serializer))
+        return coll
+
+
+    def to_parquet(self, path, **kwargs):
+        """ writes the collection to a parquet file with to_arrow. kwargs are passed to pyarrow.parquet.write_table
+        """
+        pa = import_pyarrow()
+        pa.parquet.write_table(self.to_arrow(), path, **kwargs)
+
+
+    @classmethod
+    def from_parquet(cls, path, columnar=None, **ma_kwargs):
+        """ returns a new collection loaded from a parquet file written by to_parquet. See from_arrow
+        """
+        pa = import_pyarrow()
+        return cls.from_arrow(pa.parquet.read_table(path), columnar=columnar, **ma_kwargs)
+
+
+    def _fingerprint_columns(self, start):
+        """ returns a 3-tuple of the store used for fingerprinting rows from start onwards, its columns and its absent
+        masks. Internals are converted with a temporary ColumnStore so both storage engines hash the same columns.
+        Object columns other than strings are serialized by their field, so nested internals are hashed by value
+        """
+        if self.is_columnar:
+            store = self._data
+        else:
+            store = ColumnStore(self.serializer, self.__class__.internal_class)
+            store.extend(self._data[start:])
+            start = 0
+
+        columns = {}
+        for name, (arr, mask) in store.columns().items():
+            arr, mask = arr[start:], None if mask is None else mask[start:]
+            field = self.serializer.fields[name]
+            if arr.dtype.kind == 'O' and type(field) is not fields.String:
+                nulls = mask.tolist() if mask is not None else [False] * len(arr)
+                serialized = np.empty(len(arr), dtype='O')
+                serialized[:] = [None if m else field._serialize(v, name, None) for v, m in zip(arr.tolist(), nulls)]
+                arr = serialized
+            columns[name] = (arr, mask)
+        absent = {name: mask[start:] for name, mask in store.absent_masks().items()}
+        return store, columns, absent
+
+
+    def fingerprint(self, incremental=False):
+        """ returns a hex digest of the collection's class and contents that is stable across processes and runs.
+        Collections of the same class with equal data have the same fingerprint, whether they are columnar or not.
+
+        Raises FingerprintError if the collection holds values that have no stable form, such as objects of
+        custom classes in a Raw field.
+
+        If incremental is True the digest state is kept on the collection and only rows appended since the last
+        incremental call are hashed. This assumes the collection is only appended to. Internals that are changed
+        in place are not picked up
+        """
+        state = self.__dict__.get('_fingerprint')
+        if not incremental or state is None or state[0] is not self._data or state[1].length > len(self._data):
+            start = 0
+        else:
+            start = state[1].length
+
+        store, columns, absent = self._fingerprint_columns(start)
+        if start == 0:
+            fields = [(name, store._dtypes[name]) for name in store.field_names]
+            fp = Fingerprint(self.get_fully_qualified_class_path(), fields)
+        else:
+            fp = state[1]
+        fp.update(columns, len(self._data) - start, absent=absent)
+
+        if incremental:
+            self._fingerprint = (self._data, fp)
+        return fp.hexdigest()
 
 
 
@@ -429,29 +1278,81 @@ class CollectionBuilder(AbstractCollectionBuilder):
     namespace for binx.registry and the adapter chain.
     """
 
-    def __init__(self, name=None, unique_fields=None):
+    def __init__(self, name=None, unique_fields=None, compact=False):
         self.name = name  # NOTE in v0.3.0 the name can be optionally set in the build. Left in for backwards compatibility
         self.unique_fields = None   #NOTE placeholder... future builds will be able to declare unique constraints here
+        self.compact = compact
 
 
     def _make_dynamic_class(self, name, args, base_class=InternalObject):
         """ a factory method for making classes dynamically.The default base_class thats used
         is the InternalObject. NOTE args is an iterable
         """
+        valid_args = frozenset(args)
 
         def __init__(self, **kwargs):
             base_class.__init__(self)
             for k,v in kwargs.items():
-                if k not in args:
+                if k not in valid_args:
+                    raise TypeError("Argument {} not valid for {}".format(k, self.__class__.__name__))
+                setattr(self, k, v)
+        return BuiltInternalMeta(name, (base_class, ), {'__init__': __init__ })
+
+
+    def _make_compact_class(self, name, args, base_class=InternalObject):
+        """ a factory method for making classes dynamically that store their fields in __slots__
+        rather than a per-instance __dict__. With the default base_class the class is built on CompactInternalObject
+        and registered as a virtual subclass of InternalObject, so instances have no __dict__ and only accept
+        their fields. Unset fields raise AttributeError on access, same as a missing key in the dict based class.
+        """
+        args = tuple(args)
+        valid_args = frozenset(args)
+
+        def __init__(self, **kwargs):
+            for k,v in kwargs.items():
+                if k not in valid_args:
                     raise TypeError("Argument {} not valid for {}".format(k, self.__class__.__name__))
                 setattr(self, k, v)
-        return type(name, (base_class, ), {'__init__': __init__ })
+
+        def from_dict(cls, data):
+            if not valid_args.issuperset(data):
+                invalid = [k for k in data if k not in valid_args]
+                raise TypeError("Argument {} not valid for {}".format(invalid[0], cls.__name__))
+            obj = cls.__new__(cls)
+            for k,v in data.items():
+                setattr(obj, k, v)
+            return obj
+
+        bases = (CompactInternalObject, ) if base_class is InternalObject else (base_class, )
+        klass = BuiltInternalMeta(name, bases, {'__init__': __init__, '__slots__': args, 'from_dict': classmethod(from_dict)})
+        if base_class is InternalObject:
+            InternalObject.register(klass)
+        return klass
+
+
+    def _internal_key(self, name, serializer_class, args, compact):
+        """ returns the registry key of an internal. It only depends on how the class is built, so a process that
+        builds the same collection finds its own class when unpickling internals from another process
+        """
+        return '{}.{}:{}:{}:{}'.format(serializer_class.__module__, serializer_class.__qualname__, name,
+            ','.join(args), 'compact' if compact else 'dict')
+
+
+    def _register_internal(self, klass, args, compact, key):
+        """ records how the internal was built and registers it in binx.registry under key so that the class and
+        its instances can be pickled
+        """
+        klass._binx_key = key
+        klass._binx_fields = tuple(args)
+        klass._binx_compact = compact
+        register_internal(key, klass)
+        return klass
 
 
     def _make_collection_class(self, name, serializer_class, internal_class, base_class=BaseCollection):
         """ specifically makes collection classes by assigning the two necessary class attributes
         """
-        class_attrs = {'serializer_class': serializer_class, 'internal_class': internal_class}
+        class_attrs = {'serializer_class': serializer_class, 'internal_class': internal_class, '_binx_built': True}
         x =  type(name, (base_class, ), class_attrs)
         return x
 
@@ -470,14 +1371,18 @@ class CollectionBuilder(AbstractCollectionBuilder):
         return list(vars(serializer_class)['_declared_fields'].keys())
 
 
-    def _build_internal(self, name, serializer_class):
+    def _build_internal(self, name, serializer_class, compact=False):
         """ constructs and registers the internal object for the collection.
         Returns a subclass of InternalObject. This is used internally in the classes
         build method, but also can be used to
         """
         args = self._get_declared_fields(serializer_class)
-        klass = self._make_dynamic_class(name, args, base_class=InternalObject)
-        return klass
+        if compact:
+            klass = self._make_compact_class(name, args, base_class=InternalObject)
+        else:
+            klass = self._make_dynamic_class(name, args, base_class=InternalObject)
+        key = self._internal_key(name, serializer_class, args, compact)
+        return self._register_internal(klass, args, compact, key)
 
 
     def _get_name_from_serializer_class(self, serializer_class):
@@ -488,12 +1393,15 @@ class CollectionBuilder(AbstractCollectionBuilder):
         return serializer_class.__name__.replace('Serializer', '').replace('Schema', '')
 
 
-    def build(self, serializer_class, name=None, internal_only=False):
+    def build(self, serializer_class, name=None, internal_only=False, compact=None):
         """ dynamically creates and returns a Collection class given a serializer
         and identifier. If internal_only is set to True then this will only return the internal.
         This is useful if you are using a declarative approach to defining the collections and want to
         add or override some of the base behavior
 
+        If compact is True the internal class stores its fields in __slots__ and has no instance __dict__, which
+        cuts the memory used per record to a fraction of the dict based class. If None the builder's compact
+        attribute is used.
         """
         # name detection. Check init for a string, then check build kwarg. If either is None then
         # derive the name from the serializer_class.
@@ -504,7 +1412,9 @@ class CollectionBuilder(AbstractCollectionBuilder):
             name = self._get_name_from_serializer_class(serializer_class)
 
         coll_name, internal_name = self._parse_names(name) # create the col name
-        internal_class = self._build_internal(internal_name, serializer_class) # create the internal class
+        if compact is None:
+            compact = self.compact
+        internal_class = self._build_internal(internal_name, serializer_class, compact=compact) # create the internal class
 
         if internal_only:
             return internal_class
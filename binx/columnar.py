@@ -0,0 +1,226 @@
+""" Column-wise validation of DataFrames for BaseCollection.load_data. Rather than converting a frame
+to records and passing every value through marshmallow, each column is checked against its field
+using dtype checks and vectorized numpy/pandas operations. Only columns that need per-value work
+(fields with validators, object columns of mixed types, strings that need parsing) are materialized
+as python values and passed to the field's deserialize method.
+
+The loader never builds error messages itself. If anything in a frame can not be validated here it
+raises ColumnarFallback and the caller uses the record based marshmallow path, which produces the
+same ValidationErrors as before.
+"""
+
+import re
+
+import numpy as np
+from pandas.api.types import infer_dtype
+from marshmallow import fields, EXCLUDE
+from marshmallow.utils import missing
+
+from .compiler import can_compile_load, load_default
+from .storage import python_values
+
+import logging
+l = logging.getLogger(__name__)
+
+
+class ColumnarFallback(Exception):
+    """ raised when a frame has to be loaded through the marshmallow record path
+    """
+
+
+# maps a datetime format to the resolution it preserves. Only formats made up of these directives
+# and literal separators can be truncated with a vectorized floor instead of strftime/strptime
+_FORMAT_DIRECTIVES = re.compile(r'%[YmdHMSf]')
+_FORMAT_RESOLUTIONS = [
+    (('%Y', '%m', '%d', '%H', '%M', '%S', '%f'), 'us'),
+    (('%Y', '%m', '%d', '%H', '%M', '%S'), 's'),
+    (('%Y', '%m', '%d', '%H', '%M'), 'min'),
+    (('%Y', '%m', '%d', '%H'), 'h'),
+    (('%Y', '%m', '%d'), 'D'),
+]
+
+def format_resolution(data_format):
+    """ returns the pandas frequency a datetime is truncated to when it is written with data_format and
+    parsed back, or None if the format can not be handled with a vectorized floor
+    """
+    if '%' in _FORMAT_DIRECTIVES.sub('', data_format.replace('%%', '')):
+        return None  # some other directive like %z, %b or %j
+    directives = tuple(sorted(set(_FORMAT_DIRECTIVES.findall(data_format))))
+    for required, resolution in _FORMAT_RESOLUTIONS:
+        if directives == tuple(sorted(required)):
+            return resolution
+    return None
+
+
+def can_load_columnar(serializer):
+    """ returns True if frames for this serializer instance can be validated column-wise
+    """
+    if not can_compile_load(serializer):
+        return False
+    for name, field in serializer.load_fields.items():
+        if field.attribute is not None or isinstance(field, (fields.Nested, fields.Method, fields.Function)):
+            return False
+    return True
+
+
+class DataFrameLoader(object):
+    """ validates a DataFrame column by column against a serializer instance. load returns a dictionary of
+    attribute names and (array, mask) tuples that can be appended to a ColumnStore or turned into internals
+    """
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+
+
+    def _null_mask(self, col):
+        return np.asarray(col.isna())
+
+
+    def _per_value(self, field, key, col, mask):
+        """ runs the field's own deserialize over each non-null value. Values are cleaned the same way the
+        record path does it in BaseCollection._clean_dataframe
+        """
+        data_format = self.serializer.dateformat_fields.get(field.name)
+        if data_format is not None and str(col.dtype) == 'datetime64[ns]':
+            col = col.dt.strftime(data_format)
+
+        values = col.astype(object).tolist()
+        out = np.empty(len(values), dtype='O')
+        deserialize = field.deserialize
+        try:
+            for i, v in enumerate(values):
+                out[i] = None if mask[i] else deserialize(v, key, None)
+        except Exception as err:
+            raise ColumnarFallback('Column {} failed per-value validation'.format(key)) from err
+        return out
+
+
+    def _vectorized(self, field, col, mask):
+        """ attempts to validate a column using its dtype. Returns the validated array or None if the
+        column needs per-value validation
+        """
+        ftype = type(field)
+        kind = col.dtype.kind
+        valid = np.asarray(col)[~mask] if mask.any() else np.asarray(col)
+
+        if ftype is fields.Integer:
+            if kind in ('i', 'u'):
+                return np.asarray(col, dtype='int64')
+            if kind == 'f' and not field.strict:
+                if not np.isfinite(valid).all() or (np.abs(valid) >= 2 ** 63).any():
+                    return None
+                return np.trunc(np.asarray(col.fillna(0))).astype('int64')  # same as int(value)
+            return None
+
+        if ftype is fields.Float:
+            if kind in ('i', 'u', 'f'):
+                arr = np.asarray(col, dtype='float64')
+                if not field.allow_nan and np.isinf(arr[~mask]).any():
+                    return None
+                return arr
+            return None
+
+        if ftype is fields.String:
+            if kind == 'O' and (len(valid) == 0 or infer_dtype(valid, skipna=True) == 'string'):
+                return np.asarray(col, dtype='O')
+            return None
+
+        if ftype is fields.Boolean:
+            if kind == 'b':
+                return np.asarray(col)
+            if kind == 'O' and len(valid) > 0 and infer_dtype(valid, skipna=True) == 'boolean':
+                return np.asarray(col.fillna(False), dtype='bool')
+            return None
+
+        if ftype in (fields.Date, fields.DateTime):
+            # the record path writes these columns with strftime and marshmallow parses them back, which is
+            # the same as truncating to the finest unit in the format
+            data_format = self.serializer.dateformat_fields.get(field.name)
+            if str(col.dtype) != 'datetime64[ns]':
+                return None
+            if data_format is None:
+                if ftype is fields.DateTime and field.format in (None, 'iso', 'iso8601'):
+                    return np.asarray(col.dt.floor('us'))   # NOTE iso datetimes keep their microseconds
+                return None
+            resolution = format_resolution(data_format)
+            if resolution is None:
+                return None
+            if ftype is fields.Date:
+                resolution = 'D'  # NOTE Date always drops the time component
+            return np.asarray(col.dt.floor(resolution))
+
+        return None
+
+
+    def load(self, df):
+        """ validates the frame and returns a 2-tuple of the number of rows and a dictionary of
+        attribute names and (array, mask) tuples. Raises ColumnarFallback if the frame has to be loaded
+        through marshmallow
+        """
+        if not df.columns.is_unique:
+            raise ColumnarFallback('Duplicate column names')
+
+        load_fields = self.serializer.load_fields
+        keys = {}
+        for name, field in load_fields.items():
+            keys[field.data_key if field.data_key is not None else name] = name
+
+        unknown = [c for c in df.columns if c not in keys]
+        if len(unknown) > 0 and self.serializer.unknown != EXCLUDE:
+            raise ColumnarFallback('Unknown columns {}'.format(unknown))
+
+        columns = {}
+        for key, name in keys.items():
+            field = load_fields[name]
+            if key not in df.columns:
+                if field.required or load_default(field) is not missing:
+                    raise ColumnarFallback('Column {} must go through marshmallow'.format(key))
+                continue
+
+            col = df[key]
+            mask = self._null_mask(col)
+            if mask.any() and not field.allow_none:
+                raise ColumnarFallback('Column {} has nulls'.format(key))
+
+            arr = None
+            if type(field) in (fields.Integer, fields.Float, fields.String, fields.Boolean, fields.Date, fields.DateTime) \
+                    and not field.validators:
+                arr = self._vectorized(field, col, mask)
+            if arr is None:
+                if type(field) not in (fields.Integer, fields.Float, fields.String, fields.Boolean, fields.Date,
+                        fields.DateTime, fields.List, fields.Dict):
+                    raise ColumnarFallback('Field {} is not a core field'.format(name))
+                arr = self._per_value(field, key, col, mask)
+
+            columns[name] = (arr, mask)
+
+        return len(df), columns
+
+
+def columns_to_internals(columns, length, serializer):
+    """ builds a list of internals from the output of DataFrameLoader.load. Fields are set under their attribute
+    name in load_fields order to match the marshmallow path
+    """
+    internal_class = serializer._InternalClass
+    make_internal = getattr(internal_class, 'from_dict', None) or (lambda d: internal_class(**d))
+
+    kinds = {}
+    for name, field in serializer.load_fields.items():
+        if isinstance(field, fields.Date):
+            kinds[name] = 'date'
+        elif isinstance(field, fields.DateTime):
+            kinds[name] = 'datetime'
+
+    names = [name for name in serializer.load_fields if name in columns]
+    attrs = [serializer.load_fields[name].attribute or name for name in names]
+    lists = []
+    for name in names:
+        arr, mask = columns[name]
+        values = python_values(arr, kinds.get(name))
+        if mask.any():
+            for i in np.flatnonzero(mask).tolist():
+                values[i] = None
+        lists.append(values)
+
+    return [make_internal(dict(zip(attrs, row))) for row in zip(*lists)] if len(names) > 0 \
+        else [make_internal({}) for _ in range(length)]
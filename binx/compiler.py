@@ -0,0 +1,300 @@
+""" Generates specialized load and dump functions for BaseSerializer instances. Marshmallow dispatches
+every value through a generic chain of field methods, hooks and error stores. For flat schemas built
+from the common field types this module writes a single python function per serializer that handles
+each field inline and only calls back into marshmallow for values it can not handle itself.
+
+The compiled functions never produce errors of their own. Any invalid record raises CompilerFallback
+and the caller re-runs the input through marshmallow so that results and ValidationError messages are
+identical to the uncompiled path.
+"""
+
+import datetime
+import weakref
+
+from marshmallow import fields, Schema, EXCLUDE, RAISE
+from marshmallow.decorators import PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA, PRE_DUMP, POST_DUMP
+from marshmallow.utils import missing
+
+import logging
+l = logging.getLogger(__name__)
+
+
+# exact field classes that the compiler knows how to handle. Subclasses are always delegated to marshmallow
+CORE_FIELDS = (fields.Integer, fields.Float, fields.String, fields.Boolean, fields.Date, fields.DateTime,
+    fields.List, fields.Dict)
+
+_code_cache = weakref.WeakKeyDictionary()   # serializer class -> {(config, kind): code object}
+
+
+class CompilerFallback(Exception):
+    """ raised inside a compiled function when a record must go through the marshmallow path
+    """
+
+
+def load_default(field):
+    """ returns the value a field loads when it is missing from the input. marshmallow 3.13 renamed missing
+    to load_default
+    """
+    return field.load_default if hasattr(field, 'load_default') else field.missing
+
+
+def dump_default(field):
+    """ returns the value a field dumps when the attribute is missing. marshmallow 3.13 renamed default
+    to dump_default
+    """
+    return field.dump_default if hasattr(field, 'dump_default') else field.default
+
+
+def _is_core(field):
+    return type(field) in CORE_FIELDS
+
+
+def _load_fast_check(field, i):
+    """ returns a 2-tuple of a python expression that checks if v can skip _deserialize and the expression
+    that produces the loaded value. Returns None if the field has no shortcut
+    """
+    ftype = type(field)
+    if ftype is fields.Integer:
+        return 'type(v) is int', 'v'
+    if ftype is fields.Float:
+        if field.allow_nan:
+            return 'type(v) is float', 'v'
+        return 'type(v) is float and v - v == 0.0', 'v'   # NOTE v - v is nan for nan and inf
+    if ftype is fields.String:
+        return 'type(v) is str', 'v'
+    if ftype is fields.Boolean:
+        if not field.truthy or (True in field.truthy and False in field.falsy):
+            return '(v is True or v is False)', 'v'
+        return None
+    if ftype in (fields.Date, fields.DateTime):
+        data_format = field.format or field.DEFAULT_FORMAT
+        if data_format in field.DESERIALIZATION_FUNCS:
+            return None
+        # NOTE parsed values are memoized per load call in m<i> since date strings tend to repeat
+        if ftype is fields.Date:
+            return 'type(v) is str', 'm{0}.get(v) or m{0}.setdefault(v, _strptime(v, c{0}).date())'.format(i)
+        return 'type(v) is str', 'm{0}.get(v) or m{0}.setdefault(v, _strptime(v, c{0}))'.format(i)
+    return None
+
+
+def _dump_fast_check(field, i):
+    """ returns a 2-tuple of a python expression that checks if v can skip _serialize and the expression
+    that produces the dumped value. Returns None if the field has no shortcut
+    """
+    ftype = type(field)
+    if ftype in (fields.Integer, fields.Float) and not field.as_string:
+        return 'type(v) is {}'.format(ftype.num_type.__name__), 'v'
+    if ftype is fields.String:
+        return 'type(v) is str', 'v'
+    if ftype is fields.Boolean:
+        return '(v is True or v is False)', 'v'
+    if ftype in (fields.Date, fields.DateTime):
+        data_format = field.format or field.DEFAULT_FORMAT
+        if data_format in field.SERIALIZATION_FUNCS:
+            return None
+        # NOTE only naive values are memoized. Aware datetimes compare equal across timezones
+        if ftype is fields.Date:
+            check = 'type(v) is _date'
+        else:
+            check = 'type(v) is _datetime and v.tzinfo is None'
+        return check, 'm{0}.get(v) or m{0}.setdefault(v, v.strftime(c{0}))'.format(i)
+    return None
+
+
+def _load_source(schema):
+    """ writes the source of a function that loads a sequence of records into internals
+    """
+    lines = [
+        'def load(records):',
+        '    out = []',
+        '    append = out.append',
+    ]
+    for i, field in enumerate(schema.load_fields.values()):
+        if isinstance(field, fields.DateTime):
+            lines.append('    m{} = {{}}'.format(i))
+    lines += [
+        '    for rec in records:',
+        '        if type(rec) is not dict:',
+        '            raise _Fallback',
+    ]
+    if schema.unknown == RAISE:
+        lines += [
+        '        if not _keys.issuperset(rec):',
+        '            raise _Fallback']
+    lines.append('        d = {}')
+
+    for i, (name, field) in enumerate(schema.load_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attr = field.attribute or name
+        lines.append('        v = rec.get({!r}, _missing)'.format(key))
+
+        if not _is_core(field) or field.validators:
+            # full marshmallow semantics for this field only
+            lines += [
+        '        v = f{}.deserialize(v, {!r}, rec)'.format(i, key),
+        '        if v is not _missing:',
+        '            d[{!r}] = v'.format(attr)]
+            continue
+
+        lines.append('        if v is _missing:')
+        if field.required:
+            lines.append('            raise _Fallback')
+        elif load_default(field) is not missing:
+            lines.append('            d[{!r}] = f{}.deserialize(v, {!r}, rec)'.format(attr, i, key))
+        else:
+            lines.append('            pass')
+
+        lines.append('        elif v is None:')
+        lines.append('            d[{!r}] = None'.format(attr) if field.allow_none else '            raise _Fallback')
+
+        fast = _load_fast_check(field, i)
+        if fast is not None:
+            lines += [
+        '        elif {}:'.format(fast[0]),
+        '            d[{!r}] = {}'.format(attr, fast[1])]
+        lines += [
+        '        else:',
+        '            d[{!r}] = f{}._deserialize(v, {!r}, rec)'.format(attr, i, key)]
+
+    lines += [
+        '        append(_make(d))',
+        '    return out']
+    return '\n'.join(lines)
+
+
+def _dump_source(schema):
+    """ writes the source of a function that dumps a sequence of internals to a list of dicts
+    """
+    lines = [
+        'def dump(objs):',
+        '    out = []',
+        '    append = out.append',
+    ]
+    for i, field in enumerate(schema.dump_fields.values()):
+        if isinstance(field, fields.DateTime):
+            lines.append('    m{} = {{}}'.format(i))
+    lines += [
+        '    for obj in objs:',
+        '        if type(obj) is not _cls:',
+        '            raise _Fallback',
+        '        d = {}',
+    ]
+    for i, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attr = field.attribute or name
+
+        if not _is_core(field) or dump_default(field) is not missing or '.' in attr:
+            lines += [
+        '        v = f{}.serialize({!r}, obj, accessor=_get_attribute)'.format(i, name),
+        '        if v is not _missing:',
+        '            d[{!r}] = v'.format(key)]
+            continue
+
+        lines += [
+        '        v = _getattr(obj, {!r}, _missing)'.format(attr),
+        '        if v is not _missing:',
+        '            if v is None:',
+        '                d[{!r}] = None'.format(key)]
+        fast = _dump_fast_check(field, i)
+        if fast is not None:
+            lines += [
+        '            elif {}:'.format(fast[0]),
+        '                d[{!r}] = {}'.format(key, fast[1])]
+        lines += [
+        '            else:',
+        '                d[{!r}] = f{}._serialize(v, {!r}, obj)'.format(key, i, name)]
+
+    lines += [
+        '        append(d)',
+        '    return out']
+    return '\n'.join(lines)
+
+
+def _uses_default_hooks(schema, tags):
+    """ checks that the only registered processor among tags is BaseSerializer.load_object
+    """
+    for tag in tags:
+        for attr_name, _, _ in schema._hooks[tag]:
+            if tag != POST_LOAD or attr_name != 'load_object':
+                return False
+    return True
+
+
+def can_compile_load(schema):
+    """ returns True if load can be compiled for this schema instance
+    """
+    from .collection import BaseSerializer
+    if type(schema).load_object is not BaseSerializer.load_object:
+        return False
+    if not _uses_default_hooks(schema, (PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA)):
+        return False
+    if schema.partial or schema.unknown not in (RAISE, EXCLUDE) or schema.dict_class is not dict:
+        return False
+    return not any('.' in (f.attribute or name) for name, f in schema.load_fields.items())
+
+
+def can_compile_dump(schema):
+    """ returns True if dump can be compiled for this schema instance
+    """
+    if not _uses_default_hooks(schema, (PRE_DUMP, POST_DUMP)):
+        return False
+    if type(schema).get_attribute is not Schema.get_attribute or schema.dict_class is not dict:
+        return False
+    return not hasattr(schema._InternalClass, '__getitem__')
+
+
+def _get_code(schema, kind, source_func):
+    config = (tuple(schema.load_fields), tuple(schema.dump_fields), schema.unknown)
+    class_cache = _code_cache.setdefault(type(schema), {})
+    code = class_cache.get((config, kind))
+    if code is None:
+        source = source_func(schema)
+        code = compile(source, '<binx compiled {} {}>'.format(kind, type(schema).__name__), 'exec')
+        class_cache[(config, kind)] = code
+    return code
+
+
+def _namespace(schema, field_items):
+    internal_class = schema._InternalClass
+    make = getattr(internal_class, 'from_dict', None) or (lambda d: internal_class(**d))
+    ns = {
+        '_Fallback': CompilerFallback,
+        '_missing': missing,
+        '_keys': frozenset(f.data_key if f.data_key is not None else name for name, f in schema.load_fields.items()),
+        '_make': make,
+        '_cls': internal_class,
+        '_getattr': getattr,
+        '_get_attribute': schema.get_attribute,
+        '_strptime': datetime.datetime.strptime,
+        '_date': datetime.date,
+        '_datetime': datetime.datetime,
+    }
+    for i, (name, field) in enumerate(field_items):
+        ns['f{}'.format(i)] = field
+        if isinstance(field, fields.DateTime):  # Date subclasses DateTime in ma3
+            ns['c{}'.format(i)] = field.format or field.DEFAULT_FORMAT
+    return ns
+
+
+class CompiledSerializer(object):
+    """ holds the generated load and dump functions for a single serializer instance. Either may be None
+    if the serializer uses features the compiler does not support, in which case marshmallow is used.
+    """
+
+    def __init__(self, schema):
+        self.load = None
+        self.dump = None
+
+        if can_compile_load(schema):
+            ns = _namespace(schema, schema.load_fields.items())
+            exec(_get_code(schema, 'load', _load_source), ns)
+            self.load = ns['load']
+        else:
+            l.debug('{} load is not compilable. Using marshmallow'.format(type(schema).__name__))
+
+        if can_compile_dump(schema):
+            ns = _namespace(schema, schema.dump_fields.items())
+            exec(_get_code(schema, 'dump', _dump_source), ns)
+            self.dump = ns['dump']
+        else:
+            l.debug('{} dump is not compilable. Using marshmallow'.format(type(schema).__name__))
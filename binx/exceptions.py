@@ -45,3 +45,8 @@ class AdapterChainError(BinxError):
 class AdapterFunctionError(BinxError, ValueError):
     """ thrown if a 2-tuple is not returned from a pluggable adapter function.
     """
+
+
+class FingerprintError(BinxError, TypeError):
+    """ raised if a collection holds values that can not be hashed the same way across processes
+    """
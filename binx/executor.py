@@ -0,0 +1,78 @@
+""" Executors decide where adapter work runs. By default adapter chains run inline in the calling thread.
+An executor can be passed to BaseCollection.adapt, adapt_many and aadapt or set globally with
+set_default_executor.
+
+SerialExecutor, ThreadExecutor and ProcessExecutor cover the common cases, but any object that follows the
+concurrent.futures.Executor interface can be used, for instance a client for a cluster of worker processes.
+
+A chain submitted to an executor runs as a single task, so the input collection is sent to the worker once
+and only the final collection comes back. Collections are pickled with their internals or ColumnStore
+arrays. Their serializer is rebuilt on the other side instead of dumping and re-loading the records.
+"""
+
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+import logging
+l = logging.getLogger(__name__)
+
+
+_default_executor = None
+
+
+class SerialExecutor(Executor):
+    """ runs each submitted call inline in the calling thread and returns a future that is already done
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as err:
+            future.set_exception(err)
+        else:
+            future.set_result(result)
+        return future
+
+
+class ThreadExecutor(ThreadPoolExecutor):
+    """ runs adapter work on a pool of threads. Useful for adapters that release the GIL in numpy/pandas
+    or wait on I/O
+    """
+
+
+class ProcessExecutor(ProcessPoolExecutor):
+    """ runs adapter work on a pool of processes. Adapters, collections and context values must be picklable.
+    Collections and internals made by the CollectionBuilder are.
+
+    NOTE costs recorded for adapters with measure_cost stay in the worker process
+    """
+
+
+def set_default_executor(executor):
+    """ sets the executor used by adapt, adapt_many and aadapt when none is passed. None runs adapters inline
+    """
+    global _default_executor
+    _default_executor = executor
+
+
+def get_default_executor():
+    """ returns the default executor or None
+    """
+    return _default_executor
+
+
+def _run_plan(plan, input_collection, accumulate, adapter_context):
+    """ runs an AdapterPlan. This is module level so that it can be sent to a process pool
+    """
+    return plan(input_collection, accumulate=accumulate, **adapter_context)
+
+
+def run_plan(plan, input_collection, accumulate=False, executor=None, **adapter_context):
+    """ runs an AdapterPlan as a single task on executor, or the default executor if None. The plan runs
+    inline if there is no executor. Returns the final AdapterOutputContainer
+    """
+    if executor is None:
+        executor = _default_executor
+    if executor is None:
+        return plan(input_collection, accumulate=accumulate, **adapter_context)
+    return executor.submit(_run_plan, plan, input_collection, accumulate, adapter_context).result()
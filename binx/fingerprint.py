@@ -0,0 +1,94 @@
+""" Content fingerprints for collections. A fingerprint is a digest of a collection's class, fields and rows that
+is stable across processes and runs. It is computed from columns rather than from serialized records. Fixed
+width columns are hashed as raw little-endian bytes in one call each. Object columns such as strings, lists
+and dicts are hashed value by value as canonical json. Values that have no canonical json form raise
+FingerprintError rather than hashing their repr, which may hold a memory address.
+
+Each field keeps its own running hash of values and of its null mask, which are fed in row order. Appending
+rows only needs the new rows to be hashed, and the digest does not depend on how the rows were chunked.
+"""
+
+import datetime
+import decimal
+import hashlib
+import json
+
+import numpy as np
+
+from .exceptions import FingerprintError
+
+import logging
+l = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise FingerprintError('A {} can not be fingerprinted'.format(type(value).__name__))
+
+
+def encode_column(arr, mask, absent=None):
+    """ returns the bytes hashed for an array and its null mask. Values under the mask are zeroed so that
+    the fill value of a null does not change the digest. absent is an optional mask of the nulls that have no
+    value rather than None, which are hashed as 2 in the mask
+    """
+    if mask is None:
+        mask = np.zeros(len(arr), dtype=bool)
+    mask_bytes = mask.tobytes() if absent is None else (mask.astype('uint8') + absent.astype('uint8')).tobytes()
+
+    kind = arr.dtype.kind
+    if kind in ('i', 'u', 'b', 'f', 'M'):
+        if kind == 'M':
+            arr = arr.astype('datetime64[ns]').view('int64')
+        elif kind == 'f':
+            arr = np.where(np.isnan(arr), np.nan, arr)   # NOTE one bit pattern for every nan
+        if mask.any():
+            arr = np.where(mask, arr.dtype.type(0), arr)
+        arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+        return arr.tobytes(), mask_bytes
+
+    dumps = json.dumps
+    parts = ['' if m else dumps(v, sort_keys=True, default=_json_default) for v, m in zip(arr.tolist(), mask.tolist())]
+    return ('\n'.join(parts) + '\n').encode() if len(parts) > 0 else b'', mask_bytes
+
+
+class Fingerprint(object):
+    """ an incremental digest over the columns of a collection. header identifies the collection class and
+    fields is a list of (name, dtype) tuples in a fixed order
+    """
+
+    def __init__(self, header, fields):
+        self._header = header
+        self._fields = list(fields)
+        self._values = {name: hashlib.blake2b() for name, _ in self._fields}
+        self._masks = {name: hashlib.blake2b() for name, _ in self._fields}
+        self.length = 0
+
+
+    def update(self, columns, length, absent=None):
+        """ feeds the next length rows. columns is a dictionary of field names and (array, mask) tuples and absent
+        an optional dictionary of field names and absent masks
+        """
+        absent = absent or {}
+        for name, _ in self._fields:
+            arr, mask = columns[name]
+            values, masks = encode_column(arr, mask, absent.get(name))
+            self._values[name].update(values)
+            self._masks[name].update(masks)
+        self.length += length
+
+
+    def hexdigest(self):
+        digest = hashlib.blake2b(self._header.encode())
+        digest.update(str(self.length).encode())
+        for name, dtype in self._fields:
+            digest.update('\n{}:{}\n'.format(name, dtype).encode())
+            digest.update(self._values[name].digest())
+            digest.update(self._masks[name].digest())
+        return digest.hexdigest()
@@ -4,16 +4,42 @@ are created by the user and registered at runtime.
 """
 
 from .exceptions import RegistryError
-from .utils import bfs_shortest_path
+from .utils import bfs_shortest_path, dijkstra_shortest_path
 import warnings
 
 _collection_registry = {}
+_internal_registry = {}   #NOTE internals built at runtime by the CollectionBuilder keyed by a unique name
+
+# adapter paths are memoized per (from_class, end_class) pair. Any change to the collection graph bumps the
+# generation and the cache is cleared on the next lookup
+_generation = 0
+_path_cache = {}
+_path_cache_generation = 0
+_adapter_graph = None   #NOTE directed graph of adapters used for cost routing. Rebuilt when the generation changes
+_adapter_graph_generation = -1
+
+# observed seconds and rows per adapter class for cost routing
+_adapter_costs = {}
+
+COST_POLICIES = ('hops', 'static', 'measured')
 
 from pprint import pprint
 
+def _bump_generation():
+    global _generation
+    _generation += 1
+
+
+def registry_generation():
+    """ returns a counter that is incremented each time a collection, adapter or adaptable collection is registered
+    """
+    return _generation
+
+
 def register_collection(cls):
     """ registers a new collection class.
     """
+    _bump_generation()
     fullpath = cls.__module__ + '.' + cls.__name__
 
     if fullpath in _collection_registry: # if the fullpath is already
@@ -48,15 +74,33 @@ def get_class_from_collection_registry(classname):
     return klass_tuple
 
 
+def register_internal(key, cls):
+    """ registers an internal class built at runtime under a unique key. Built classes can not be found by their
+    module and name, so pickle uses this key to find the class again
+    """
+    _internal_registry[key] = cls
+
+
+def get_internal_from_registry(key):
+    """ returns the internal class registered under key
+    """
+    try:
+        return _internal_registry[key]
+    except KeyError:
+        raise RegistryError('The internal {} was not found in the registry'.format(key))
+
+
 def register_adapter_to_collection(classname, adapter):
     """ appends an adapter to the klass object
     """
+    _bump_generation()
     _collection_registry[classname][1]['registered_adapters'].add(adapter)
 
 
 def register_adaptable_collection(classname, coll):
     """ appends an adaptable collection to a classes list of adaptable collections
     """
+    _bump_generation()
     _collection_registry[classname][1]['adaptable_from'].add(coll)
 
 
@@ -81,13 +125,90 @@ def _make_cc_graph():
 
 
 
-def adapter_path(from_class, end_class):
+def record_adapter_cost(adapter_class, seconds, rows):
+    """ adds an observed run of an adapter to its measured cost
+    """
+    totals = _adapter_costs.setdefault(adapter_class, [0.0, 0])
+    totals[0] += seconds
+    totals[1] += max(rows, 1)
+
+
+def get_adapter_cost(adapter_class, measured=True):
+    """ returns the cost of an adapter used by cost routing. If measured is True and the adapter has recorded runs
+    this is the mean seconds per row, otherwise it is the adapter's declared cost
+    """
+    if measured and adapter_class in _adapter_costs:
+        seconds, rows = _adapter_costs[adapter_class]
+        return seconds / rows
+    return adapter_class.cost
+
+
+def _get_adapter_graph():
+    """ returns a directed graph of collection classes to their targets and the adapter classes for each edge
+    """
+    global _adapter_graph, _adapter_graph_generation
+    if _adapter_graph_generation != _generation:
+        graph = {}
+        for name, entry in _collection_registry.items():
+            for adapter_class in entry[1]['registered_adapters']:
+                edges = graph.setdefault(adapter_class.from_collection_class, {})
+                edges.setdefault(adapter_class.target_collection_class, []).append(adapter_class)
+        _adapter_graph = graph
+        _adapter_graph_generation = _generation
+    return _adapter_graph
+
+
+def _cost_adapter_path(from_class, end_class, measured):
+    """ returns the adapters on the cheapest route between the two classes. Costs are read on each call so that
+    new measurements are picked up right away
+    """
+    graph = {}
+    cheapest = {}
+    for coll, targets in _get_adapter_graph().items():
+        graph[coll] = {}
+        for target, adapter_classes in targets.items():
+            costs = [(get_adapter_cost(a, measured), i) for i, a in enumerate(adapter_classes)]
+            cost, i = min(costs)
+            graph[coll][target] = cost
+            cheapest[(coll, target)] = adapter_classes[i]
+
+    colls = dijkstra_shortest_path(graph, from_class, end_class)
+    return [cheapest[(colls[i - 1], colls[i])] for i in range(1, len(colls))]
+
+
+def adapter_path(from_class, end_class, cost='hops'):
     """ traverses the registry and builds a class path of adapters to a target using
     by looking at each nodes 'adaptable_from' set. It will traverse the graph until all possibilities
     are exhausted. If it finds a matching adaptable, it returns the path of adapter objects that
     are needed to adapt the schema. If no path is found it returns an empty list
+
+    Paths are cached until the registry generation changes. Code that edits the registry entries directly
+    instead of using the register functions should call _bump_generation
+
+    cost sets the routing policy. 'hops' returns the route with the fewest adapters. 'static' returns the route
+    with the lowest sum of the adapters' declared cost. 'measured' uses the seconds per row recorded for adapters
+    with measure_cost set and the declared cost for the rest, so declared costs should be given in seconds per row
+    when mixing the two
     """
+    if cost not in COST_POLICIES:
+        raise ValueError('cost must be one of {}'.format(COST_POLICIES))
+    if cost != 'hops':
+        return _cost_adapter_path(from_class, end_class, measured=cost == 'measured')
 
+    global _path_cache_generation
+    if _path_cache_generation != _generation:
+        _path_cache.clear()
+        _path_cache_generation = _generation
+
+    key = (from_class, end_class)
+    if key not in _path_cache:
+        _path_cache[key] = _find_adapter_path(from_class, end_class)
+    return list(_path_cache[key])  # a copy so callers can't change the cached path
+
+
+def _find_adapter_path(from_class, end_class):
+    """ builds a snapshot of the collection graph and returns the adapters connecting the two classes
+    """
     current_graph = _make_cc_graph() # create snapshot of current path
     if len(current_graph) == 0:
         return []
@@ -0,0 +1,457 @@
+""" Storage engines for Collection internals. By default a Collection keeps its validated
+InternalObjects in a python list. The ColumnStore is an optional columnar engine that keeps one
+typed numpy array per field along with a null mask for optional fields. It behaves like a sequence
+of InternalObjects so that the Collection API works on top of it unchanged.
+"""
+
+import copy
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from marshmallow import fields
+
+import logging
+l = logging.getLogger(__name__)
+
+
+_DATETIME_US_BOUNDS = (pd.Timestamp.min.value // 1000 + 1, pd.Timestamp.max.value // 1000)
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 1
+_MAX_STRING_PADDING = 4
+
+
+def _string_array(arr, mask):
+    """ returns an object array of strings as a fixed width unicode array that can be memory-mapped, or None if it
+    holds other values. Nulls are stored as empty strings. numpy strips trailing NUL characters so strings ending
+    in one are kept as objects. So are columns over a MB where padding to the longest string would take more than
+    _MAX_STRING_PADDING times the space of the text itself
+    """
+    values = arr.tolist()
+    nulls = mask.tolist() if mask is not None else [False] * len(values)
+    out = []
+    for v, m in zip(values, nulls):
+        if m:
+            out.append('')
+        elif isinstance(v, str) and not v.endswith('\x00'):
+            out.append(v)
+        else:
+            return None
+    lengths = [len(v) for v in out]
+    width = max(lengths + [1])
+    if width * len(out) > _MAX_STRING_PADDING * max(sum(lengths), 1) and width * len(out) * 4 > 2 ** 20:
+        return None   # NOTE a few long strings would pad every row to their width
+    return np.array(out, dtype='U{}'.format(width))
+
+
+def python_values(arr, kind=None):
+    """ converts an array into a list of python objects. datetime64 arrays are converted to datetime.date
+    objects if kind is 'date' and datetime.datetime objects otherwise
+    """
+    if arr.dtype.kind == 'M':
+        if kind == 'date':
+            return arr.astype('datetime64[D]').tolist()
+        return arr.astype('datetime64[us]').tolist()
+    return arr.tolist()
+
+
+class ColumnStore(object):
+    """ A columnar container for the internals of a collection. Each field declared on the serializer
+    is stored as a numpy array using the dtypes from BaseSerializer.get_numpy_fields. Strings, lists,
+    dicts and any other non-numeric field are stored in object arrays. Optional fields also carry a
+    boolean null mask. Fields that allow None also get an absent mask once a row is missing the value, so
+    that those rows are rebuilt without the attribute rather than with None, same as the list engine.
+    Values are read from and written to the internals under the field's attribute name.
+
+    Appends are kept as chunks and consolidated lazily on the first read, so repeated calls to
+    load_data do not copy the whole store each time.
+
+    NOTE that rows are materialized as new InternalObject instances on access. Mutating an
+    internal returned from the store does not change the stored data.
+    """
+
+    def __init__(self, serializer, internal_class):
+        self._internal_class = internal_class
+        dtype_map = serializer.get_numpy_fields()
+
+        # only store fields that can actually be loaded by this serializer instance (respects only/exclude)
+        self._fields = [name for name in serializer.load_fields if name in dtype_map]
+        self._dtypes = {}
+        self._kinds = {}   # 'date', 'datetime' or None... used to rebuild python objects from datetime64 columns
+        self._allow_none = {}
+        self._attributes = {}
+        self._nullable = set()
+        self._absent = set()   # allow_none fields that have rows without a value
+
+        for name in self._fields:
+            field = serializer.fields[name]
+            self._attributes[name] = field.attribute or name
+            self._dtypes[name] = self._storage_dtype(dtype_map[name])
+            self._kinds[name] = self._field_kind(field)
+            self._allow_none[name] = field.allow_none
+            if field.allow_none or not field.required:
+                self._nullable.add(name)
+
+        self._chunks = {name: [] for name in self._fields}
+        self._mask_chunks = {name: [] for name in self._fields}
+        self._absent_chunks = {name: [] for name in self._fields}
+        self._length = 0
+        self._pending = False
+
+
+    def _storage_dtype(self, dtype):
+        """ numpy's str dtype is fixed width so strings are stored in object arrays
+        """
+        if dtype.kind in ('i', 'u', 'f', 'b', 'M'):
+            return dtype
+        return np.dtype('O')
+
+
+    def _field_kind(self, field):
+        if isinstance(field, fields.Date):  # NOTE ma3 Date subclasses DateTime so check this first
+            return 'date'
+        if isinstance(field, fields.DateTime):
+            return 'datetime'
+        return None
+
+
+    @property
+    def field_names(self):
+        return list(self._fields)
+
+
+    def __len__(self):
+        return self._length
+
+
+    def _to_array(self, name, values, mask):
+        """ converts a list of python values into a typed array for a field. Falls back to an
+        object array if the values can not be represented by the field's dtype
+        """
+        dtype = self._dtypes[name]
+        try:
+            if dtype.kind == 'M':
+                if any(getattr(v, 'tzinfo', None) is not None for v in values):
+                    raise ValueError('timezone aware datetimes are stored as objects')
+                arr = np.array(values, dtype='datetime64[us]')
+                valid = arr[~mask].astype('int64')
+                if len(valid) > 0 and (valid.min() < _DATETIME_US_BOUNDS[0] or valid.max() > _DATETIME_US_BOUNDS[1]):
+                    raise ValueError('datetime out of bounds for datetime64[ns]')
+                return arr.astype(dtype)
+
+            if dtype.kind in ('i', 'u', 'b'):
+                filler = False if dtype.kind == 'b' else 0
+                return np.array([filler if m else v for v, m in zip(values, mask)], dtype=dtype)
+
+            if dtype.kind == 'f':
+                return np.array([np.nan if m else v for v, m in zip(values, mask)], dtype=dtype)
+
+        except (TypeError, ValueError, OverflowError) as err:
+            l.warning('Storing field {} as object dtype: {}'.format(name, err))
+
+        return self._object_array(values)
+
+
+    def _object_array(self, values):
+        """ builds a 1-d object array. Avoids numpy creating nested arrays from lists of lists
+        """
+        arr = np.empty(len(values), dtype='O')
+        arr[:] = values
+        return arr
+
+
+    def _backfill_mask(self, name):
+        """ makes a field nullable after the fact by adding an all False mask for existing rows
+        """
+        self._consolidate()
+        self._nullable.add(name)
+        self._mask_chunks[name] = [np.zeros(self._length, dtype=bool)]
+
+
+    def _append_absent(self, name, absent, length):
+        """ records which of the next length rows of an allow_none field have no value. absent is a boolean
+        array or None if every row has one. Other fields do not need this since their nulls are always absent
+        """
+        if not self._allow_none[name]:
+            return
+        if absent is not None and absent.any() and name not in self._absent:
+            self._absent.add(name)
+            self._absent_chunks[name] = [np.zeros(self._length, dtype=bool)]
+        if name in self._absent:
+            self._absent_chunks[name].append(absent if absent is not None else np.zeros(length, dtype=bool))
+
+
+    def extend(self, internals):
+        """ appends a list of InternalObject instances to the store
+        """
+        internals = list(internals)
+        if len(internals) == 0:
+            return
+        missing = object()
+        for name in self._fields:
+            attr = self._attributes[name]
+            values = [getattr(obj, attr, missing) for obj in internals]
+            absent = np.fromiter((v is missing for v in values), dtype=bool, count=len(values))
+            mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values)) | absent
+            values = [None if v is missing else v for v in values]
+            if mask.any() and name not in self._nullable:
+                self._backfill_mask(name)
+
+            self._chunks[name].append(self._to_array(name, values, mask))
+            if name in self._nullable:
+                self._mask_chunks[name].append(mask)
+            self._append_absent(name, absent, len(internals))
+
+        self._length += len(internals)
+        self._pending = True
+
+
+    def extend_columns(self, columns, length, absent=None):
+        """ appends already validated columns to the store. columns is a dictionary of field names and
+        (array, mask) tuples. Fields missing from columns are stored as absent nulls. absent is an optional
+        dictionary of field names and masks of the nulls in columns that are absent rather than None
+        """
+        if length == 0:
+            return
+        absent = absent or {}
+        for name in self._fields:
+            if name in columns:
+                arr, mask = columns[name]
+                absent_mask = absent.get(name)
+            else:
+                arr, mask = None, np.ones(length, dtype=bool)
+                absent_mask = mask
+
+            if mask.any() and name not in self._nullable:
+                self._backfill_mask(name)
+
+            dtype = self._dtypes[name]
+            if arr is None or arr.dtype != dtype:
+                values = [None] * length if arr is None else self._python_values(name, arr)
+                arr = self._to_array(name, values, mask)
+
+            self._chunks[name].append(arr)
+            if name in self._nullable:
+                self._mask_chunks[name].append(mask)
+            self._append_absent(name, absent_mask, length)
+
+        self._length += length
+        self._pending = True
+
+
+    def __iadd__(self, internals):
+        self.extend(internals)
+        return self
+
+
+    def copy(self):
+        """ returns a new store that shares the arrays of this one. Appending to either does not change the other
+        """
+        new = copy.copy(self)
+        new._chunks = {name: list(chunks) for name, chunks in self._chunks.items()}
+        new._mask_chunks = {name: list(chunks) for name, chunks in self._mask_chunks.items()}
+        new._absent_chunks = {name: list(chunks) for name, chunks in self._absent_chunks.items()}
+        new._nullable = set(self._nullable)
+        new._absent = set(self._absent)
+        return new
+
+
+    def __getstate__(self):
+        """ pickles one consolidated array per field
+        """
+        self._consolidate()
+        return self.__dict__.copy()
+
+
+    def save(self, path):
+        """ writes each field to a .npy file in the directory path, along with its null mask and a manifest.json
+        describing the fields. Numbers, booleans, datetimes and strings are written as plain arrays that can be
+        memory-mapped. Other object columns are pickled. The manifest is written last
+        """
+        self._consolidate()
+        os.makedirs(path, exist_ok=True)
+
+        saved = []
+        for i, name in enumerate(self._fields):
+            arr, mask = self.column(name)
+            if arr.dtype.kind == 'O':
+                strings = _string_array(arr, mask)
+                arr = strings if strings is not None else arr
+            pickled = arr.dtype.kind == 'O'
+
+            entry = {'name': name, 'dtype': str(self._dtypes[name]), 'file': 'field_{}.npy'.format(i),
+                'mask': None, 'absent': None, 'pickled': pickled}
+            np.save(os.path.join(path, entry['file']), arr, allow_pickle=pickled)
+            if mask is not None:
+                entry['mask'] = 'mask_{}.npy'.format(i)
+                np.save(os.path.join(path, entry['mask']), mask)
+            absent = self.absent(name)
+            if absent is not None:
+                entry['absent'] = 'absent_{}.npy'.format(i)
+                np.save(os.path.join(path, entry['absent']), absent)
+            saved.append(entry)
+
+        manifest = {'version': MANIFEST_VERSION, 'length': self._length, 'fields': saved}
+        tmp = os.path.join(path, MANIFEST + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+    @classmethod
+    def open(cls, path, serializer, internal_class, mmap_mode='r'):
+        """ returns a store over the arrays written by save. Arrays are memory-mapped with mmap_mode, so pages are
+        read on demand and shared between processes through the page cache. Pickled object columns are read into
+        memory. The values are not validated again, but the manifest must list the same fields and dtypes as
+        this serializer. Raises ValueError if it does not
+        """
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError('Unsupported manifest version {}'.format(manifest.get('version')))
+
+        store = cls(serializer, internal_class)
+        expected = [[name, str(store._dtypes[name])] for name in store._fields]
+        saved = [[entry['name'], entry['dtype']] for entry in manifest['fields']]
+        if saved != expected:
+            raise ValueError('The arrays in {} were saved with fields {}, expected {}'.format(path, saved, expected))
+
+        length = manifest['length']
+        if length == 0:
+            return store   # NOTE empty files can not be mapped
+
+        for entry in manifest['fields']:
+            name = entry['name']
+            pickled = entry['pickled']
+            arr = np.load(os.path.join(path, entry['file']), mmap_mode=None if pickled else mmap_mode,
+                allow_pickle=pickled)
+            if len(arr) != length:
+                raise ValueError('Field {} has {} rows, expected {}'.format(name, len(arr), length))
+            store._chunks[name] = [arr]
+
+            if entry['mask'] is not None:
+                store._nullable.add(name)
+                store._mask_chunks[name] = [np.load(os.path.join(path, entry['mask']), mmap_mode=mmap_mode)]
+            elif name in store._nullable:
+                store._mask_chunks[name] = [np.zeros(length, dtype=bool)]
+
+            if entry.get('absent') is not None:   # NOTE older manifests have no absent masks
+                store._absent.add(name)
+                store._absent_chunks[name] = [np.load(os.path.join(path, entry['absent']), mmap_mode=mmap_mode)]
+
+        store._length = length
+        return store
+
+
+    def _consolidate(self):
+        """ concatenates any pending chunks into a single array per field
+        """
+        if not self._pending:
+            return
+        for name in self._fields:
+            chunks = self._chunks[name]
+            if len(chunks) > 1:
+                if len(set(c.dtype for c in chunks)) > 1:  # a chunk fell back to object... keep python objects
+                    chunks = [self._object_array(self._python_values(name, c)) for c in chunks]
+                self._chunks[name] = [np.concatenate(chunks)]
+            if len(self._mask_chunks[name]) > 1:
+                self._mask_chunks[name] = [np.concatenate(self._mask_chunks[name])]
+            if len(self._absent_chunks[name]) > 1:
+                self._absent_chunks[name] = [np.concatenate(self._absent_chunks[name])]
+        self._pending = False
+
+
+    def column(self, name):
+        """ returns a 2-tuple of the stored array for a field and its null mask. The mask is None
+        if the field is not nullable
+        """
+        self._consolidate()
+        chunks = self._chunks[name]
+        arr = chunks[0] if len(chunks) > 0 else np.array([], dtype=self._dtypes[name])
+        if name not in self._nullable:
+            return arr, None
+        masks = self._mask_chunks[name]
+        mask = masks[0] if len(masks) > 0 else np.array([], dtype=bool)
+        return arr, mask
+
+
+    def columns(self):
+        """ returns a dictionary of field names and (array, mask) tuples
+        """
+        return {name: self.column(name) for name in self._fields}
+
+
+    def absent(self, name):
+        """ returns the mask of the rows of a field that have no value rather than None, or None if every null
+        of the field is None. For fields that do not allow None every null is absent and this returns None
+        """
+        if name not in self._absent:
+            return None
+        self._consolidate()
+        return self._absent_chunks[name][0]
+
+
+    def absent_masks(self):
+        """ returns a dictionary of field names and absent masks for the fields that have any
+        """
+        return {name: self.absent(name) for name in self._fields if name in self._absent}
+
+
+    def _make_internal(self, record):
+        from_dict = getattr(self._internal_class, 'from_dict', None)
+        if from_dict is not None:
+            return from_dict(record)
+        return self._internal_class(**record)
+
+
+    def _python_values(self, name, arr):
+        """ converts an array slice back into a list of python objects
+        """
+        return python_values(arr, self._kinds[name])
+
+
+    def _rows(self, start, stop):
+        """ yields internals for a range of rows. Columns are converted to python lists once per
+        call rather than once per value
+        """
+        cols = []
+        for name in self._fields:
+            arr, mask = self.column(name)
+            values = self._python_values(name, arr[start:stop])
+            nulls = mask[start:stop].tolist() if mask is not None else None
+            absent = self.absent(name)
+            if absent is not None:
+                absent = absent[start:stop].tolist()
+            elif not self._allow_none[name]:
+                absent = nulls
+            cols.append((self._attributes[name], values, nulls, absent))
+
+        make_internal = self._make_internal
+        for i in range(stop - start):
+            record = {}
+            for attr, values, nulls, absent in cols:
+                if nulls is not None and nulls[i]:
+                    if absent is None or not absent[i]:
+                        record[attr] = None
+                    continue
+                record[attr] = values[i]
+            yield make_internal(record)
+
+
+    def __iter__(self):
+        return self._rows(0, self._length)
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            indices = range(*i.indices(self._length))
+            if indices.step == 1:
+                return list(self._rows(indices.start, max(indices.start, indices.stop)))
+            return [self[j] for j in indices]
+        if i < 0:
+            i += self._length
+        if i < 0 or i >= self._length:
+            raise IndexError('ColumnStore index out of range')
+        return next(self._rows(i, i + 1))
@@ -4,6 +4,9 @@
 """
 
 import datetime
+from collections import deque
+import heapq
+import itertools
 from dateutil.relativedelta import relativedelta
 import os
 import pandas as pd
@@ -16,23 +19,60 @@ from pprint import pprint
 import datetime
 
 def bfs_shortest_path(graph, start, end):
-    """ a generic bfs search algo
+    """ a generic bfs search algo. graph is a dictionary of vertices and their neighbors. Returns the
+    shortest path from start to end as a list of vertices or an empty list if there is none. Vertices that are
+    not keys in graph have no neighbors.
+
+    Each vertex is visited at most once and the path is rebuilt from parent pointers, so the search
+    is O(V + E)
+    """
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        vertex = queue.popleft()
+        for next_vertex in graph.get(vertex, ()):
+            if next_vertex in parents:
+                continue
+            parents[next_vertex] = vertex
+            if next_vertex == end:
+                path = [next_vertex]
+                while vertex is not None:
+                    path.append(vertex)
+                    vertex = parents[vertex]
+                return path[::-1]
+            queue.append(next_vertex)
+    return []
+
+
+def dijkstra_shortest_path(graph, start, end):
+    """ a generic weighted shortest path search. graph is a dictionary of vertices and dictionaries of
+    their neighbors and non-negative edge weights. Returns the cheapest path from start to end as a list of
+    vertices or an empty list if there is none
     """
-    def _bfs_paths(graph, start, end):
-        # bfs using a generator. should return shortest path if any for an iteration
-
-        queue = [(start, [start])]
-        while queue:
-            (vertex, path) = queue.pop(0)
-            for next_vertex in graph[vertex] - set(path):
-                if next_vertex == end:
-                    yield path + [next_vertex]
-                else:
-                    queue.append((next_vertex, path + [next_vertex]))
-    try:
-        return next(_bfs_paths(graph, start, end))
-    except StopIteration:
-        return []
+    counter = itertools.count()   # NOTE breaks ties so vertices themselves are never compared
+    parents = {start: None}
+    best = {start: 0}
+    done = set()
+    heap = [(0, next(counter), start)]
+    while heap:
+        dist, _, vertex = heapq.heappop(heap)
+        if vertex in done:
+            continue
+        if vertex == end and vertex != start:
+            path = []
+            while vertex is not None:
+                path.append(vertex)
+                vertex = parents[vertex]
+            return path[::-1]
+        done.add(vertex)
+        for next_vertex, weight in graph.get(vertex, {}).items():
+            d = dist + weight
+            if next_vertex == start or next_vertex in done or d >= best.get(next_vertex, float('inf')):
+                continue
+            best[next_vertex] = d
+            parents[next_vertex] = vertex
+            heapq.heappush(heap, (d, next(counter), next_vertex))
+    return []
 
 
 class ObjUtils(object):
@@ -32,6 +32,7 @@ setup(
     ],
     description="Interfaces for an in-memory datastore and calc framework using marshmallow + pandas",
     install_requires=requirements,
+    extras_require={'arrow': ['pyarrow']},
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
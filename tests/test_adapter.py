@@ -1,15 +1,23 @@
 """ These are basic integration tests for the adapter class
 """
 
+import asyncio
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 import os
+from datetime import date
 
 from binx.collection import BaseCollection, BaseSerializer, CollectionBuilder
-from binx.adapter import AdapterOutputContainer, AbstractAdapter, register_adapter, PluggableAdapter
-from marshmallow import fields
+from binx.adapter import AdapterOutputContainer, AbstractAdapter, register_adapter, PluggableAdapter, AdapterPlan, \
+    DataFrameAdapter, AsyncAbstractAdapter, FanOutPlan
+from marshmallow import fields, Schema
 
 import binx.collection
 from binx.registry import _make_cc_graph, adapter_path
+from binx import registry
+from binx.executor import SerialExecutor, set_default_executor
 from binx.utils import bfs_shortest_path
 
 from pprint import pprint
@@ -241,6 +249,30 @@ class TestAdapterCollectionIntegration(unittest.TestCase):
             if k != 'TestBBCollection':
                 self.assertEqual(test_context[k], context[k])
 
+
+    def test_plan_from_returns_reusable_plan(self):
+
+        plan = self.TestCCCollection.plan_from(self.TestAACollection)
+        self.assertIsInstance(plan, AdapterPlan)
+        self.assertEqual(len(plan), 2)
+        self.assertIsInstance(plan.adapters[0], self.SimpleAToBAdapter)
+
+        for a in (41, 42):
+            test_a_coll = self.TestAACollection()
+            test_a_coll.load_data([{'a': a}])
+            output = plan(test_a_coll, foo='bar')
+            self.assertEqual(output.collection.data, [{'c': 43, 'b': 42, 'a': a}])
+            self.assertEqual(output.context['foo'], 'bar')
+
+        with self.assertRaises(AttributeError):
+            plan.adapters = ()
+
+
+    def test_plan_from_raises_AdapterChainError_without_path(self):
+
+        with self.assertRaises(AdapterChainError):
+            self.TestAACollection.plan_from(self.TestCCCollection)
+
  
 class TestPluggableAdapter(unittest.TestCase):
 
@@ -442,4 +474,430 @@ def adapt_b_to_c_context_bad(collection, **context):
 
 
 def adapt_b_to_c_raise_exception(collection, **context):
-    raise Exception('boo')
\ No newline at end of file
+    raise Exception('boo')
+
+class TestCostRouting(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # a diamond with a direct expensive route from A to C and a cheaper one through B
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(TestASerializer, name='CostRouteA')
+        cls.BCollection = builder.build(TestBSerializer, name='CostRouteB')
+        cls.CCollection = builder.build(TestCSerializer, name='CostRouteC')
+
+        def make_adapter(from_class, target_class, cost, value, columns):
+            class CostAdapter(AbstractAdapter):
+                from_collection_class = from_class
+                target_collection_class = target_class
+                measure_cost = True
+
+                def adapt(self, collection, **context):
+                    df = collection.to_dataframe()
+                    for col in columns:
+                        df[col] = value
+                    return self.render_return(df, route=context.get('route', '') + self.__class__.__name__)
+            CostAdapter.cost = cost
+            CostAdapter.__name__ = 'CostAdapter{}{}'.format(from_class.__name__[9], target_class.__name__[9])
+            register_adapter(CostAdapter)
+            return CostAdapter
+
+        cls.AToC = make_adapter(cls.ACollection, cls.CCollection, 10.0, 1, ['b', 'c'])
+        cls.AToB = make_adapter(cls.ACollection, cls.BCollection, 1.0, 2, ['b'])
+        cls.BToC = make_adapter(cls.BCollection, cls.CCollection, 1.0, 2, ['c'])
+
+
+    def tearDown(self):
+        for adapter_class in (self.AToC, self.AToB, self.BToC):
+            registry._adapter_costs.pop(adapter_class, None)
+
+
+    def test_adapt_routes_by_policy(self):
+        a_coll = self.ACollection([{'a': 1}])
+
+        self.assertEqual(adapter_path(self.ACollection, self.CCollection, cost='hops'), [self.AToC])
+        self.assertEqual(adapter_path(self.ACollection, self.CCollection, cost='static'), [self.AToB, self.BToC])
+
+        c_coll, context = self.CCollection.adapt(a_coll, cost='static')
+        self.assertEqual(context['route'], 'CostAdapterABCostAdapterBC')
+        self.assertEqual(c_coll.data, [{'a': 1, 'b': 2, 'c': 2}])
+
+        with self.assertRaises(ValueError):
+            self.CCollection.adapt(a_coll, cost='cheapest')
+
+
+    def test_measured_costs_override_declared_costs(self):
+        self.assertEqual(adapter_path(self.ACollection, self.CCollection, cost='measured'), [self.AToB, self.BToC])
+
+        registry.record_adapter_cost(self.AToC, 0.001, 1000)
+        self.assertEqual(registry.get_adapter_cost(self.AToC), 1e-6)
+        self.assertEqual(registry.get_adapter_cost(self.AToC, measured=False), 10.0)
+        self.assertEqual(adapter_path(self.ACollection, self.CCollection, cost='measured'), [self.AToC])
+
+        plan = self.CCollection.plan_from(self.ACollection, cost='measured')
+        plan(self.ACollection([{'a': 1}, {'a': 2}]))
+        self.assertEqual(registry._adapter_costs[self.AToC][1], 1002)  # the run above was recorded
+
+
+class TestSchemaConformantAdapters(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(TestASerializer, name='ConformantA')
+        cls.BCollection = builder.build(TestBSerializer, name='ConformantB')
+        cls.CCollection = builder.build(TestCSerializer, name='ConformantC')
+
+        class AToB(AbstractAdapter):
+            from_collection_class = cls.ACollection
+            target_collection_class = cls.BCollection
+            schema_conformant = True
+
+            def adapt(self, collection, **context):
+                df = collection.to_dataframe()
+                df['b'] = 42
+                return self.render_return(df)
+
+        class BToC(AbstractAdapter):
+            from_collection_class = cls.BCollection
+            target_collection_class = cls.CCollection
+            schema_conformant = True
+
+            def adapt(self, collection, **context):
+                return self.render_return([{'a': i.a, 'b': i.b, 'c': 43} for i in collection])
+
+        register_adapter(AToB)
+        register_adapter(BToC)
+
+
+    def test_only_the_final_collection_is_validated(self):
+        a_coll = self.ACollection([{'a': 41}, {'a': 40}])
+
+        with mock.patch.object(BaseSerializer, 'load', autospec=True, side_effect=Schema.load) as load:
+            c_coll, context = self.CCollection.adapt(a_coll, accumulate=True)
+
+        self.assertEqual([type(call[0][0]) for call in load.call_args_list], [TestCSerializer])
+        self.assertEqual(c_coll.data, [{'a': 41, 'b': 42, 'c': 43}, {'a': 40, 'b': 42, 'c': 43}])
+        self.assertIsInstance(context['ConformantBCollection'][0].a, int)
+
+
+    def test_single_hop_is_validated(self):
+        a_coll = self.ACollection([{'a': 41}])
+
+        with mock.patch.object(BaseCollection, '_load_unvalidated', autospec=True) as load_unvalidated:
+            b_coll, _ = self.BCollection.adapt(a_coll)
+
+        load_unvalidated.assert_not_called()
+        self.assertEqual(b_coll.data, [{'a': 41, 'b': 42}])
+
+
+class DatedASerializer(BaseSerializer):
+    a = fields.Integer()
+    day = fields.Date()
+
+
+class DatedBSerializer(DatedASerializer):
+    y = fields.Integer()
+
+
+class DatedCSerializer(DatedBSerializer):
+    z = fields.Integer()
+
+
+class TestConformantAdaptersWithDumpedData(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        builder = CollectionBuilder()
+        cls.collections = {}
+        for columnar in (False, True):
+            colls = [builder.build(ser, name='Dumped{}{}'.format(ser.__name__[5], int(columnar)))
+                for ser in (DatedASerializer, DatedBSerializer, DatedCSerializer)]
+            for coll in colls:
+                coll.columnar = columnar
+            cls.collections[columnar] = colls
+
+            class AToB(AbstractAdapter):
+                from_collection_class = colls[0]
+                target_collection_class = colls[1]
+                schema_conformant = True
+
+                def adapt(self, collection, **context):
+                    return self.render_return([dict(r, y=1) for r in collection.data])   # dates are strings here
+
+            class BToC(AbstractAdapter):
+                from_collection_class = colls[1]
+                target_collection_class = colls[2]
+
+                def adapt(self, collection, **context):
+                    return self.render_return(collection.to_dataframe().assign(z=2))
+
+            register_adapter(AToB)
+            register_adapter(BToC)
+
+
+    def test_non_conformant_dicts_are_validated(self):
+        for columnar, (ACollection, _, CCollection) in self.collections.items():
+            c_coll, _ = CCollection.adapt(ACollection([{'a': 1, 'day': '2017-05-04'}]))
+            self.assertEqual(c_coll[0].day, date(2017, 5, 4))
+            self.assertEqual(c_coll.data, [{'a': 1, 'day': '2017-05-04', 'y': 1, 'z': 2}])
+
+
+def frame_a_to_b(df, **context):
+    return df.assign(b=df['a'] + 1), {'frame_var': 'hep'}
+
+def frame_b_to_c(df, **context):
+    return df.assign(c=df['b'] + 1), {}
+
+
+class TestDataFrameAdapter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(TestASerializer, name='FrameA')
+        cls.BCollection = builder.build(TestBSerializer, name='FrameB')
+        cls.CCollection = builder.build(TestCSerializer, name='FrameC')
+
+        class FrameAToB(DataFrameAdapter):
+            from_collection_class = cls.ACollection
+            target_collection_class = cls.BCollection
+            calc = frame_a_to_b
+
+        class FrameBToC(DataFrameAdapter):
+            from_collection_class = cls.BCollection
+            target_collection_class = cls.CCollection
+            calc = frame_b_to_c
+
+        register_adapter(FrameAToB)
+        register_adapter(FrameBToC)
+        cls.FrameAToB = FrameAToB
+
+
+    def test_calc_signature_is_checked(self):
+
+        def bad(collection, **context):
+            pass
+
+        with self.assertRaises(AssertionError):
+            self.FrameAToB()._check_calc(bad)
+
+
+    def test_frames_are_handed_between_dataframe_adapters(self):
+        a_coll = self.ACollection([{'a': 1}, {'a': 2}])
+
+        with mock.patch.object(self.BCollection, 'load_data', autospec=True) as load_b:
+            c_coll, context = self.CCollection.adapt(a_coll, foo='bar')
+
+        load_b.assert_not_called()  # no intermediate collection was built
+        self.assertEqual(c_coll.data, [{'a': 1, 'b': 2, 'c': 3}, {'a': 2, 'b': 3, 'c': 4}])
+        self.assertEqual(context, {'foo': 'bar', 'frame_var': 'hep'})
+
+        c_coll, context = self.CCollection.adapt(a_coll, accumulate=True)
+        self.assertEqual(context['FrameBCollection'].data, [{'a': 1, 'b': 2}, {'a': 2, 'b': 3}])
+
+
+class TestAsyncAdapter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(TestASerializer, name='AsyncA')
+        cls.BCollection = builder.build(TestBSerializer, name='AsyncB')
+        cls.CCollection = builder.build(TestCSerializer, name='AsyncC')
+
+        class AsyncAToB(AsyncAbstractAdapter):
+            from_collection_class = cls.ACollection
+            target_collection_class = cls.BCollection
+
+            async def adapt(self, collection, **context):
+                await asyncio.sleep(0.01)   # stands in for a call to a service
+                data = [{'a': i.a, 'b': i.a + 1} for i in collection]
+                return self.render_return(data, looked_up=True)
+
+        class SyncBToC(AbstractAdapter):
+            from_collection_class = cls.BCollection
+            target_collection_class = cls.CCollection
+
+            def adapt(self, collection, **context):
+                cls.threads.append(threading.get_ident())
+                data = [{'a': i.a, 'b': i.b, 'c': i.b + context['offset']} for i in collection]
+                return self.render_return(data)
+
+        cls.threads = []
+        register_adapter(AsyncAToB)
+        register_adapter(SyncBToC)
+
+
+    def test_aadapt_awaits_async_adapters_and_accumulates_context(self):
+        a_coll = self.ACollection([{'a': 1}])
+
+        c_coll, context = asyncio.run(self.CCollection.aadapt(a_coll, accumulate=True, offset=10))
+        self.assertEqual(c_coll.data, [{'a': 1, 'b': 2, 'c': 12}])
+        self.assertEqual(context['offset'], 10)
+        self.assertTrue(context['looked_up'])
+        self.assertEqual(context['AsyncBCollection'].data, [{'a': 1, 'b': 2}])
+
+
+    def test_aadapt_runs_concurrently(self):
+
+        async def run_many():
+            colls = [self.ACollection([{'a': i}]) for i in range(50)]
+            return await asyncio.gather(*[self.CCollection.aadapt(c, offset=0) for c in colls])
+
+        results = asyncio.run(run_many())
+        self.assertEqual([r[0][0].a for r in results], list(range(50)))
+
+
+    def test_aadapt_ignores_a_serial_default_executor(self):
+        del self.threads[:]
+        set_default_executor(SerialExecutor())
+        try:
+            asyncio.run(self.CCollection.aadapt(self.ACollection([{'a': 1}]), offset=0))
+        finally:
+            set_default_executor(None)
+        self.assertNotEqual(self.threads, [threading.get_ident()])   # not run on the loop thread
+
+
+    def test_sync_adapt_raises_AdapterChainError_for_async_adapters(self):
+        with self.assertRaises(AdapterChainError):
+            self.CCollection.adapt(self.ACollection([{'a': 1}]), offset=0)
+
+
+class TestFanOutPlan(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # A -> B -> C, A -> B -> D and A -> E. B is shared by the routes to C and D
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(TestASerializer, name='FanA')
+        cls.BCollection = builder.build(TestBSerializer, name='FanB')
+        cls.CCollection = builder.build(TestCSerializer, name='FanC')
+        cls.DCollection = builder.build(TestCSerializer, name='FanD')
+        cls.ECollection = builder.build(TestBSerializer, name='FanE')
+        cls.calls = []
+
+        def make_adapter(from_class, target_class, column, value):
+            class FanAdapter(AbstractAdapter):
+                from_collection_class = from_class
+                target_collection_class = target_class
+
+                def adapt(self, collection, **context):
+                    cls.calls.append(target_class)
+                    df = collection.to_dataframe()
+                    df[column] = value + context.get('offset', 0)
+                    return self.render_return(df, **{target_class.__name__: True})
+            register_adapter(FanAdapter)
+
+        make_adapter(cls.ACollection, cls.BCollection, 'b', 1)
+        make_adapter(cls.BCollection, cls.CCollection, 'c', 2)
+        make_adapter(cls.BCollection, cls.DCollection, 'c', 3)
+        make_adapter(cls.ACollection, cls.ECollection, 'b', 4)
+
+
+    def setUp(self):
+        del self.calls[:]
+
+
+    def test_fan_out_computes_shared_intermediates_once(self):
+        targets = [self.CCollection, self.DCollection, self.ECollection, self.BCollection]
+        plan = FanOutPlan(self.ACollection, targets)
+        self.assertEqual(len(plan), 4)
+
+        for executor in (None, ThreadPoolExecutor(max_workers=3)):
+            del self.calls[:]
+            results = plan(self.ACollection([{'a': 1}]), executor=executor, offset=10)
+
+            self.assertEqual(sorted(c.__name__ for c in self.calls), ['FanBCollection', 'FanCCollection',
+                'FanDCollection', 'FanECollection'])
+            self.assertEqual(set(results), set(targets))
+            self.assertEqual(results[self.CCollection][0].data, [{'a': 1, 'b': 11, 'c': 12}])
+            self.assertEqual(results[self.DCollection][0].data, [{'a': 1, 'b': 11, 'c': 13}])
+            self.assertEqual(results[self.ECollection][0].data, [{'a': 1, 'b': 14}])
+
+            context = results[self.CCollection][1]   # each target gets the context of its own route
+            self.assertEqual(context, {'offset': 10, 'FanBCollection': True, 'FanCCollection': True})
+            if executor is not None:
+                executor.shutdown()
+
+
+    def test_adapt_many_accumulates_and_raises_AdapterChainError(self):
+        results = self.ACollection([{'a': 1}]).adapt_many([self.DCollection], accumulate=True)
+        self.assertIsInstance(results[self.DCollection][1]['FanBCollection'], self.BCollection)
+
+        with self.assertRaises(AdapterChainError):
+            self.ACollection([{'a': 1}]).adapt_many([self.DCollection], offset='x')
+
+        with self.assertRaises(AdapterChainError):
+            self.ECollection([{'a': 1}]).adapt_many([self.DCollection])
+
+
+class TestIncrementalAdapt(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(TestASerializer, name='DeltaA')
+        cls.BCollection = builder.build(TestBSerializer, name='DeltaB')
+        cls.CCollection = builder.build(TestCSerializer, name='DeltaC')
+        cls.rows = []
+
+        class AToB(AbstractAdapter):
+            from_collection_class = cls.ACollection
+            target_collection_class = cls.BCollection
+            rowwise = True
+
+            def adapt(self, collection, **context):
+                cls.rows.append(len(collection))
+                seen = {'seen_one': True} if any(i.a == 1 for i in collection) else {}
+                return self.render_return([{'a': i.a, 'b': i.a * 2} for i in collection], rows=len(collection), **seen)
+
+        class BToC(AbstractAdapter):
+            from_collection_class = cls.BCollection
+            target_collection_class = cls.CCollection
+
+            def adapt(self, collection, **context):
+                total = sum(i.b for i in collection)   # NOTE depends on every row
+                return self.render_return([{'a': i.a, 'b': i.b, 'c': total} for i in collection])
+
+        register_adapter(AToB)
+        register_adapter(BToC)
+
+
+    def setUp(self):
+        del self.rows[:]
+
+
+    def test_rowwise_chain_adapts_only_appended_rows(self):
+        for columnar in (False, True):
+            del self.rows[:]
+            a_coll = self.ACollection([{'a': 1}, {'a': 2}], columnar=columnar)
+            b1, _ = self.BCollection.adapt_incremental(a_coll)
+
+            a_coll.load_data([{'a': 3}])
+            b2, ctx2 = self.BCollection.adapt_incremental(a_coll, previous=b1)
+            b3, ctx3 = self.BCollection.adapt_incremental(a_coll, previous=b2)
+
+            self.assertEqual(ctx2, {'seen_one': True, 'rows': 1})   # the delta run is merged over the first context
+            self.assertEqual(ctx3, ctx2)
+
+            self.assertEqual(self.rows, [2, 1])
+            self.assertEqual(b2.data, self.BCollection.adapt(a_coll)[0].data)
+            self.assertEqual(b3.data, b2.data)
+            self.assertEqual(len(b1), 2)   # previous is not changed
+
+
+    def test_falls_back_to_full_recompute(self):
+        a_coll = self.ACollection([{'a': 1}])
+        c1, _ = self.CCollection.adapt_incremental(a_coll)
+        a_coll.load_data([{'a': 2}])
+        c2, _ = self.CCollection.adapt_incremental(a_coll, previous=c1)
+        self.assertEqual([i.c for i in c2], [6, 6])   # BToC is not rowwise
+        self.assertEqual(self.rows, [1, 2])
+
+        b1, _ = self.BCollection.adapt_incremental(a_coll)
+        other = self.ACollection([{'a': 1}, {'a': 2}, {'a': 5}])   # a different lineage
+        b2, _ = self.BCollection.adapt_incremental(other, previous=b1)
+        b3, _ = self.BCollection.adapt_incremental(other, previous=b2, some_var=1)   # a different context
+        self.assertEqual(self.rows, [1, 2, 2, 3, 3])
+        self.assertEqual(len(b3), 3)
@@ -0,0 +1,111 @@
+""" tests for Arrow and Parquet conversion
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+
+from binx.collection import InternalObject, BaseSerializer, BaseCollection
+from binx.columnar import DataFrameLoader
+
+from marshmallow import fields
+
+from datetime import datetime, date
+from unittest import mock
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class ArrowTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    count = fields.Integer(allow_none=True)
+    name = fields.Str(allow_none=True)
+    number = fields.Float(allow_none=True)
+    date = fields.Date(allow_none=True)
+    datet = fields.DateTime(allow_none=True)
+    stamp = fields.DateTime(allow_none=True, data_key='ts')
+    tf = fields.Bool()
+    some_list = fields.List(fields.Integer(), allow_none=True)
+
+    class Meta:
+        dateformat = '%Y-%m-%d'
+        datetimeformat = '%Y-%m-%d %H:%M:%S'
+
+
+class IsoArrowTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    datet = fields.DateTime(allow_none=True)
+
+
+class ArrowTestCollection(BaseCollection):
+    serializer_class = ArrowTestSerializer
+    internal_class = InternalObject
+
+
+class IsoArrowTestCollection(BaseCollection):
+    serializer_class = IsoArrowTestSerializer
+    internal_class = InternalObject
+
+
+@unittest.skipIf(pa is None, 'pyarrow is not installed')
+class TestArrow(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [
+            {'id': 1, 'count': 4, 'name': 'hep', 'number': 1.5, 'date': '2017-05-04', 'datet': '2017-05-04 10:30:24',
+                'ts': '2017-05-04 10:30:24', 'tf': True, 'some_list': [1, 2]},
+            {'id': 2, 'count': None, 'name': None, 'number': None, 'date': None, 'datet': None, 'ts': None,
+                'tf': False, 'some_list': None},
+        ]
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+
+    def test_schema_is_derived_from_serializer(self):
+        table = ArrowTestCollection(self.records).to_arrow()
+        schema = table.schema
+
+        self.assertEqual(schema.field('id').type, pa.int64())
+        self.assertFalse(schema.field('id').nullable)
+        self.assertTrue(schema.field('count').nullable)
+        self.assertEqual(schema.field('date').type, pa.date32())
+        self.assertEqual(schema.field('ts').type, pa.timestamp('us'))
+        self.assertEqual(schema.field('some_list').type, pa.list_(pa.int64()))
+        self.assertEqual(table.column('count').to_pylist(), [4, None])
+        self.assertEqual(table.column('date').to_pylist(), [date(2017, 5, 4), None])
+
+
+    def test_parquet_round_trip(self):
+        path = os.path.join(self.path, 'coll.parquet')
+        for columnar in (False, True):
+            coll = ArrowTestCollection(self.records, columnar=columnar)
+            coll.to_parquet(path)
+
+            with mock.patch.object(DataFrameLoader, 'load', autospec=True, side_effect=DataFrameLoader.load) as load:
+                test = ArrowTestCollection.from_parquet(path, columnar=columnar)
+            load.assert_called_once()    # validated column by column
+            self.assertEqual(test.data, coll.data)
+            self.assertEqual(test[0].datet, datetime(2017, 5, 4, 10, 30, 24))
+
+        iso = IsoArrowTestCollection([{'id': 1, 'datet': '2017-05-04T10:30:24.500000'}, {'id': 2, 'datet': None}])
+        with mock.patch.object(DataFrameLoader, '_per_value', autospec=True) as per_value:
+            test = IsoArrowTestCollection.from_arrow(iso.to_arrow())
+        per_value.assert_not_called()   # iso datetimes are kept as datetime64
+        self.assertEqual(test.data, iso.data)
+
+
+    def test_unsupported_fields_raise_TypeError(self):
+
+        class DictSerializer(BaseSerializer):
+            some_dict = fields.Dict()
+
+        class DictCollection(BaseCollection):
+            serializer_class = DictSerializer
+            internal_class = InternalObject
+
+        with self.assertRaises(TypeError):
+            DictCollection([{'some_dict': {}}]).to_arrow()
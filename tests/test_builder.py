@@ -4,9 +4,11 @@ from builtins import *
 
 import unittest
 import os
+import pickle
 
 from binx.collection import InternalObject, BaseSerializer, BaseCollection, CollectionBuilder
 from binx.exceptions import InternalNotDefinedError, CollectionLoadError
+from binx.registry import _internal_registry
 
 from marshmallow import fields
 
@@ -138,3 +140,62 @@ class TestCollectionBuilder(unittest.TestCase):
         AliasTwo = builder.build(TestOtherAutoNameSchema)
         self.assertEqual(AliasTwo.__name__, 'TestOtherAutoNameCollection')
 
+
+
+    def test_build_compact_internal_uses_slots(self):
+
+        class TestCompactSerializer(BaseSerializer):
+            x = fields.Integer()
+            y = fields.Integer()
+            z = fields.Str()
+
+        builder = CollectionBuilder(compact=True)
+        TestCompactCollection = builder.build(TestCompactSerializer)
+        Internal = TestCompactCollection.internal_class
+
+        self.assertEqual(set(Internal.__slots__), set(['x', 'y', 'z']))
+        self.assertTrue(issubclass(Internal, InternalObject))
+
+        obj = Internal(x=1, y=2, z='a')
+        self.assertEqual((obj.x, obj.y, obj.z), (1, 2, 'a'))
+        self.assertIsInstance(obj, InternalObject)
+        self.assertFalse(hasattr(obj, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            obj.w = 1
+
+        with self.assertRaises(TypeError):
+            Internal(w=1)
+
+        with self.assertRaises(TypeError):
+            Internal.from_dict({'x': 1, 'w': 1})
+
+        coll = TestCompactCollection([{'x': 1, 'y': 2, 'z': 'a'}, {'x': 3, 'y': 4}])
+        for c in coll:
+            self.assertIsInstance(c, Internal)
+        self.assertListEqual(coll.data, [{'x': 1, 'y': 2, 'z': 'a'}, {'x': 3, 'y': 4}])
+
+
+    def test_built_internals_are_picklable(self):
+        for compact in (False, True):
+            Internal = CollectionBuilder(compact=compact).build(TestSerializer, internal_only=True)
+            obj = Internal(x=1, y=2, z='a')
+
+            self.assertIs(pickle.loads(pickle.dumps(Internal)), Internal)
+            test = pickle.loads(pickle.dumps(obj))
+            self.assertIs(type(test), Internal)
+            self.assertEqual((test.x, test.y, test.z), (1, 2, 'a'))
+
+            # a process without the class in its registry rebuilds it under the same key
+            payload = pickle.dumps(obj)
+            del _internal_registry[Internal._binx_key]
+            rebuilt = pickle.loads(payload)
+            self.assertIsNot(type(rebuilt), Internal)
+            self.assertEqual(type(rebuilt)._binx_key, Internal._binx_key)
+            self.assertEqual(rebuilt.z, 'a')
+
+            # a process that builds the same collection unpickles into its own class
+            payload = pickle.dumps(obj)
+            del _internal_registry[Internal._binx_key]
+            Rebuilt = CollectionBuilder(compact=compact).build(TestSerializer, internal_only=True)
+            self.assertIs(type(pickle.loads(payload)), Rebuilt)
@@ -0,0 +1,177 @@
+""" tests for the adapter result cache
+"""
+
+import unittest
+import unittest.mock
+import tempfile
+import shutil
+
+from binx.collection import BaseSerializer, CollectionBuilder
+from binx.adapter import AbstractAdapter, register_adapter
+from binx.exceptions import FingerprintError
+from binx.cache import AdapterCache, DiskAdapterCache, set_default_cache, context_hash, estimate_nbytes, \
+    copy_collection
+
+from marshmallow import fields
+
+
+class CacheASerializer(BaseSerializer):
+    a = fields.Integer()
+
+
+class CacheBSerializer(BaseSerializer):
+    a = fields.Integer()
+    b = fields.Integer()
+
+
+class TestAdapterCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        builder = CollectionBuilder()
+        cls.ACollection = builder.build(CacheASerializer, name='CacheA')
+        cls.BCollection = builder.build(CacheBSerializer, name='CacheB')
+        cls.calls = []
+
+        class CacheAToB(AbstractAdapter):
+            from_collection_class = cls.ACollection
+            target_collection_class = cls.BCollection
+            cacheable = True
+
+            def adapt(self, collection, **context):
+                cls.calls.append(context)
+                data = [{'a': i.a, 'b': i.a * context.get('factor', 1)} for i in collection]
+                return self.render_return(data, adapted=True)
+
+        register_adapter(CacheAToB)
+        cls.CacheAToB = CacheAToB
+
+
+    def setUp(self):
+        del self.calls[:]
+
+
+    def tearDown(self):
+        set_default_cache(None)
+        self.CacheAToB.cacheable = True
+        self.CacheAToB.version = 1
+
+
+    def test_adapt_hits_cache_for_same_content_and_context(self):
+        cache = AdapterCache()
+        b1, ctx1 = self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, factor=2)
+        b2, ctx2 = self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, factor=2)
+        b3, _ = self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, factor=3)
+        b4, _ = self.BCollection.adapt(self.ACollection([{'a': 2}]), cache=cache, factor=2)
+
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(b2.data, [{'a': 1, 'b': 2}])
+        self.assertEqual(ctx2, {'factor': 2, 'adapted': True})
+        self.assertEqual(b3.data, [{'a': 1, 'b': 3}])
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3, 'evictions': 0, 'entries': 3,
+            'nbytes': cache.stats()['nbytes']})
+
+        b2.load_data([{'a': 5, 'b': 5}])   # returned collections are copies
+        b5, _ = self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, factor=2)
+        self.assertEqual(len(b5), 1)
+
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        cache = AdapterCache(max_entries=2)
+        set_default_cache(cache)
+        for factor in (1, 2, 1, 3):   # factor 2 is least recently used when 3 is added
+            self.BCollection.adapt(self.ACollection([{'a': 1}]), factor=factor)
+
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), factor=1)
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), factor=2)
+        self.assertEqual(len(self.calls), 4)
+
+        cache = AdapterCache(max_entries=None, max_bytes=1)
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache)
+        self.assertEqual(len(cache), 0)
+
+
+    def test_non_cacheable_adapters_and_contexts_are_not_cached(self):
+        cache = AdapterCache()
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, func=lambda x: x)
+        self.assertIsNone(context_hash({'func': lambda x: x}))
+
+        self.CacheAToB.cacheable = False
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache)
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(len(cache), 0)
+
+
+    def test_disk_cache_persists_across_instances_and_versions(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+
+        b1, _ = self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=DiskAdapterCache(path), factor=2)
+        cache = DiskAdapterCache(path)
+        with unittest.mock.patch.object(self.BCollection, 'load_data') as load_data:
+            b2, ctx2 = self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, factor=2)
+            load_data.assert_not_called()   # hits are not validated again
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(b2.data, b1.data)
+        self.assertEqual(ctx2, {'factor': 2, 'adapted': True})
+        self.assertEqual(cache.stats()['hits'], 1)
+
+        self.CacheAToB.version = 2
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache, factor=2)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(cache), 2)
+
+
+    def test_disk_cache_evicts_by_size(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+
+        cache = DiskAdapterCache(path, max_bytes=None)
+        self.BCollection.adapt(self.ACollection([{'a': 1}]), cache=cache)
+        size = cache.stats()['nbytes']
+
+        cache.max_bytes = int(size * 1.5)
+        self.BCollection.adapt(self.ACollection([{'a': 2}]), cache=cache)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+    def test_estimate_nbytes_counts_compact_slots(self):
+        Compact = CollectionBuilder(compact=True).build(CacheBSerializer, name='CompactCacheB')
+        coll = Compact([{'a': 1, 'b': 10 ** 30}])
+
+        self.assertGreater(estimate_nbytes(coll), estimate_nbytes(Compact([{'a': 1, 'b': 2}])))
+
+
+    def test_copies_get_new_collection_ids(self):
+        coll = self.BCollection([{'a': 1, 'b': 2}])
+        self.assertNotEqual(copy_collection(coll).collection_id, coll.collection_id)
+
+
+
+
+
+    def test_in_place_changes_miss_the_cache(self):
+        cache = AdapterCache()
+        a_coll = self.ACollection([{'a': 1}, {'a': 2}])
+        self.BCollection.adapt(a_coll, cache=cache, factor=2)
+        a_coll[0].a = 100
+        b_coll, _ = self.BCollection.adapt(a_coll, cache=cache, factor=2)
+
+        self.assertEqual([i.b for i in b_coll], [200, 4])
+        self.assertEqual(cache.stats()['hits'], 0)
+
+
+    def test_inputs_that_can_not_be_fingerprinted_are_not_cached(self):
+        cache = AdapterCache()
+        a_coll = self.ACollection([{'a': 1}])
+        with unittest.mock.patch.object(self.ACollection, 'fingerprint', side_effect=FingerprintError('raw')):
+            self.assertIsNone(cache.make_key(a_coll, self.BCollection.plan_from(self.ACollection), False, {}))
+            self.BCollection.adapt(a_coll, cache=cache)
+        self.assertEqual(len(cache), 0)
@@ -1,7 +1,11 @@
 import unittest
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor
 import os
+import io
+import json
 
-from binx.collection import InternalObject, BaseSerializer, BaseCollection
+from binx.collection import InternalObject, BaseSerializer, BaseCollection, CollectionBuilder
 from binx.exceptions import InternalNotDefinedError, CollectionLoadError, CollectionValidationError
 
 import pandas as pd
@@ -305,6 +309,93 @@ class TestBaseCollection(unittest.TestCase):
         BaseCollection.serializer_class = InternalSerializer #NOTE must patch this back here
 
 
+    def test_to_dataframe_matches_dumped_records(self):
+
+        class DumpTestSerializer(InternalDtypeTestSerializer):
+            some_dict = fields.Dict(allow_none=True)
+            day_first = fields.DateTime('%d/%m/%Y %H:%M', allow_none=True)
+
+        BaseCollection.serializer_class = DumpTestSerializer
+        records = [dict(r, some_dict={'a': 1}, day_first='04/05/2017 10:30') for r in self.dtype_test_data] + \
+            [dict(r, some_dict=None, day_first=None) for r in self.dtype_test_data_none]
+
+        base = BaseCollection()
+        base.load_data(records)
+        base[0].datet = datetime(2017, 5, 4, 10, 30, 24, 500)   # truncated to the format like a dump
+
+        expected = base._dataframe_with_dtypes(base.data)
+        assert_frame_equal(base.to_dataframe(), expected)
+
+        BaseCollection.serializer_class = InternalSerializer
+
+
+    def test_to_dataframe_reads_fields_by_attribute(self):
+
+        class AttributeDumpSerializer(BaseSerializer):
+            a = fields.Integer(required=True, attribute='aa')
+            day = fields.Date(attribute='dd', allow_none=True)
+            b = fields.Float()
+
+        class AttributeDumpCollection(BaseCollection):
+            serializer_class = AttributeDumpSerializer
+            internal_class = InternalObject
+
+        coll = AttributeDumpCollection([{'a': 1, 'day': '2017-05-04', 'b': 2.0}, {'a': 2, 'day': None, 'b': 3.5}])
+        expected = coll._dataframe_with_dtypes(coll.data)
+        assert_frame_equal(coll.to_dataframe(), expected)
+        assert_frame_equal(next(coll.iter_dataframes(chunksize=2)), expected)
+        self.assertListEqual(list(coll.to_dataframe().columns), ['a', 'day', 'b'])
+
+
+    def test_iter_dataframes_yields_typed_chunks(self):
+
+        BaseCollection.serializer_class = InternalDtypeTestSerializer
+        records = self.dtype_test_data + [dict(r, id=None) for r in self.dtype_test_data_none]
+
+        for columnar in (False, True):
+            base = BaseCollection(columnar=columnar)
+            base.load_data(records)
+
+            chunks = list(base.iter_dataframes(3))
+            self.assertEqual([len(c) for c in chunks], [3, 3])
+            self.assertEqual(chunks[0]['id'].dtype, np.dtype('int64'))
+            self.assertEqual(chunks[1]['id'].dtype, np.dtype('float64'))   # NOTE coerced only where there are nulls
+            self.assertEqual(chunks[1].index.tolist(), [3, 4, 5])
+            assert_frame_equal(pd.concat(chunks), base.to_dataframe(), check_dtype=False)
+
+        with self.assertRaises(ValueError):
+            next(base.iter_dataframes(0))
+
+        BaseCollection.serializer_class = InternalSerializer
+
+
+    def test_to_json_streams_arrays_and_ndjson(self):
+
+        BaseCollection.serializer_class = InternalDtypeTestSerializer
+        records = self.dtype_test_data + self.dtype_test_data_none
+
+        for columnar in (False, True):
+            base = BaseCollection(columnar=columnar)
+            base.load_data(records)
+
+            f = io.StringIO()
+            self.assertIsNone(base.to_json(f, chunksize=2))
+            self.assertEqual(f.getvalue(), base.to_json())
+
+            f = io.StringIO()
+            base.to_json(f, lines=True, chunksize=4)
+            lines = f.getvalue().splitlines()
+            self.assertEqual([json.loads(line) for line in lines], json.loads(base.to_json()))
+            self.assertEqual(lines[0], json.dumps(base.data[0]))   # dates keep the serializer's formats
+            self.assertEqual(base.to_json(lines=True), f.getvalue())
+
+        f = io.StringIO()
+        BaseCollection().to_json(f)
+        self.assertEqual(f.getvalue(), '[]')
+
+        BaseCollection.serializer_class = InternalSerializer
+
+
     def test_new_collection_instances_register_on_serializer_and_internal(self):
 
         base = BaseCollection()
@@ -557,3 +648,130 @@ class TestBaseCollection(unittest.TestCase):
         self.assertListEqual(coll2.data, expected)
 
 
+
+
+    def test_data_is_memoized_and_invalidated_by_load_data(self):
+
+        BaseCollection.serializer_class = InternalSerializer
+        coll = BaseCollection(self.data)
+
+        first = coll.data
+        self.assertIs(first, coll.data)  # no re-dump on the second read
+
+        coll.load_data([{'bdbid': 4, 'name': 'zup'}])
+        second = coll.data
+        self.assertIsNot(first, second)
+        self.assertEqual(len(second), 4)
+
+
+    def test_data_cache_opt_out_returns_fresh_records(self):
+
+        BaseCollection.serializer_class = InternalSerializer
+        coll = BaseCollection(self.data, cache_data=False)
+
+        first = coll.data
+        first.append({'bdbid': 42})
+        self.assertIsNot(first, coll.data)
+        self.assertEqual(len(coll.data), 3)
+
+
+    def test_load_stream_loads_generator_in_chunks(self):
+
+        BaseCollection.serializer_class = InternalSerializer
+        records = ({'bdbid': i, 'name': 'n{}'.format(i)} for i in range(25))
+
+        coll = BaseCollection()
+        loaded = coll.load_stream(records, chunksize=10)
+
+        self.assertEqual(loaded, 25)
+        self.assertEqual(len(coll), 25)
+        self.assertEqual([c.bdbid for c in coll], list(range(25)))
+
+
+    def test_load_stream_reports_chunk_and_offset(self):
+
+        BaseCollection.serializer_class = InternalSerializer
+        records = [{'bdbid': i} for i in range(25)]
+        records[23] = {'bdbid': 'bad'}
+
+        coll = BaseCollection()
+        with self.assertRaises(CollectionValidationError) as ctx:
+            coll.load_stream(iter(records), chunksize=10)
+
+        err = ctx.exception
+        self.assertEqual(err.chunk, 2)
+        self.assertEqual(err.offset, 20)
+        self.assertIn(23, err.errors)
+        self.assertEqual(len(coll), 20)  # earlier chunks stay loaded
+
+
+    def test_load_stream_accepts_dataframe_chunks(self):
+
+        BaseCollection.serializer_class = InternalSerializer
+        frames = (pd.DataFrame(self.data) for _ in range(3))
+
+        coll = BaseCollection()
+        self.assertEqual(coll.load_stream(frames, chunksize=2), 9)
+        self.assertEqual(len(coll), 9)
+
+
+    def test_load_data_with_workers_matches_serial_load(self):
+
+        InternalCollection = CollectionBuilder(compact=True).build(InternalSerializer)
+        records = [{'bdbid': i, 'name': 'n{}'.format(i)} for i in range(50)]
+
+        for columnar in (False, True):
+            coll = InternalCollection(columnar=columnar)
+            coll.load_data(records, workers=2, partition_size=7)
+            self.assertEqual(len(coll), 50)
+            self.assertIsInstance(coll[0], InternalCollection.internal_class)
+            self.assertListEqual(coll.data, InternalCollection(records).data)
+
+
+    def test_load_stream_with_workers_shares_one_pool(self):
+
+        InternalCollection = CollectionBuilder().build(InternalSerializer)
+        records = [{'bdbid': i, 'name': 'n{}'.format(i)} for i in range(30)]
+
+        coll = InternalCollection()
+        with mock.patch('binx.collection.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool_class:
+            self.assertEqual(coll.load_stream(iter(records), chunksize=10, workers=2), 30)
+        self.assertEqual(pool_class.call_count, 1)
+        self.assertListEqual(coll.data, InternalCollection(records).data)
+
+
+    def test_load_data_with_workers_reports_rows_across_partitions(self):
+
+        InternalCollection = CollectionBuilder().build(InternalSerializer)
+        records = [{'bdbid': i} for i in range(20)]
+        records[3] = {'bdbid': 'bad'}
+        records[17] = {'bdbid': 'bad'}
+
+        coll = InternalCollection()
+        with self.assertRaises(CollectionValidationError) as ctx:
+            coll.load_data(records, workers=2, partition_size=5)
+
+        self.assertListEqual(sorted(ctx.exception.__cause__.messages), [3, 17])
+        self.assertEqual(len(coll), 0)
+
+
+    def test_unvalidated_load_uses_attributes_and_checks_nulls(self):
+
+        class AttributeSerializer(BaseSerializer):
+            a = fields.Integer(required=True, attribute='aa')
+            b = fields.Float()
+
+        class AttributeCollection(BaseCollection):
+            serializer_class = AttributeSerializer
+            internal_class = InternalObject
+
+        for columnar in (False, True):
+            coll = AttributeCollection(columnar=columnar)
+            coll.load_data([{'a': 1, 'b': 2.0}], validate=False)
+            coll.load_data(pd.DataFrame({'a': [3], 'b': [4.0]}), validate=False)
+            self.assertEqual([c.aa for c in coll], [1, 3])
+            self.assertEqual(coll.data, [{'a': 1, 'b': 2.0}, {'a': 3, 'b': 4.0}])
+
+            for records in ([{'b': 2.0}], [{'a': None}], pd.DataFrame({'a': [1.0, np.nan]}), pd.DataFrame({'b': [1.0]})):
+                with self.assertRaises(CollectionValidationError):   # the same as the validated path
+                    AttributeCollection(columnar=columnar).load_data(records, validate=False)
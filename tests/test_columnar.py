@@ -0,0 +1,125 @@
+""" tests for column-wise DataFrame validation
+"""
+
+import unittest
+
+from binx.collection import InternalObject, BaseSerializer, BaseCollection
+from binx.columnar import DataFrameLoader, ColumnarFallback, can_load_columnar, format_resolution
+from binx.exceptions import CollectionValidationError
+
+import pandas as pd
+import numpy as np
+from marshmallow import fields, validates_schema
+from marshmallow.validate import OneOf
+
+from datetime import datetime, date
+
+
+class ColumnarTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    name = fields.Str(allow_none=True)
+    number = fields.Float(allow_none=True)
+    date = fields.Date()
+    datet = fields.DateTime()
+    tf = fields.Bool()
+    kind = fields.Str(validate=OneOf(['a', 'b']))
+
+    class Meta:
+        dateformat = '%Y-%m-%d'
+        datetimeformat = '%Y-%m-%d %H:%M:%S'
+
+
+class ColumnarTestCollection(BaseCollection):
+    serializer_class = ColumnarTestSerializer
+    internal_class = InternalObject
+
+
+class TestDataFrameLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [1, 2, 3],
+            'name': ['hep', None, 'pup'],
+            'number': [1.5, np.nan, 3.0],
+            'date': pd.to_datetime(['2017-05-04 10:00:00', '2016-05-04', '2015-05-04']),
+            'datet': pd.to_datetime(['2017-05-04 10:30:24.500', '2016-05-04 10:30:24', '2015-05-04 10:30:24']),
+            'tf': [True, False, True],
+            'kind': ['a', 'b', 'a'],
+        })
+
+
+    def test_format_resolution(self):
+        self.assertEqual(format_resolution('%Y-%m-%d'), 'D')
+        self.assertEqual(format_resolution('%Y-%m-%d %H:%M:%S'), 's')
+        self.assertEqual(format_resolution('%Y-%m-%dT%H:%M:%S.%f'), 'us')
+        self.assertIsNone(format_resolution('%Y-%m'))
+        self.assertIsNone(format_resolution('%Y-%m-%d %H:%M:%S%z'))
+
+
+    def test_loader_returns_typed_columns(self):
+        s = ColumnarTestSerializer(internal=InternalObject)
+        self.assertTrue(can_load_columnar(s))
+
+        length, columns = DataFrameLoader(s).load(self.df)
+        self.assertEqual(length, 3)
+        self.assertEqual(columns['id'][0].dtype, np.dtype('int64'))
+        self.assertListEqual(columns['number'][1].tolist(), [False, True, False])
+        self.assertEqual(columns['datet'][0][0], np.datetime64('2017-05-04T10:30:24'))  # truncated like the format
+        self.assertListEqual(columns['kind'][0].tolist(), ['a', 'b', 'a'])
+
+
+    def test_dataframe_load_matches_record_load(self):
+        coll = ColumnarTestCollection(self.df)
+
+        self.assertEqual(coll[0].date, date(2017, 5, 4))
+        self.assertEqual(coll[0].datet, datetime(2017, 5, 4, 10, 30, 24))
+        self.assertIsNone(coll[1].name)
+        self.assertIsNone(coll[1].number)
+
+        records = [
+            {'id': 1, 'name': 'hep', 'number': 1.5, 'date': '2017-05-04', 'datet': '2017-05-04 10:30:24', 'tf': True, 'kind': 'a'},
+            {'id': 2, 'name': None, 'number': None, 'date': '2016-05-04', 'datet': '2016-05-04 10:30:24', 'tf': False, 'kind': 'b'},
+            {'id': 3, 'name': 'pup', 'number': 3.0, 'date': '2015-05-04', 'datet': '2015-05-04 10:30:24', 'tf': True, 'kind': 'a'},
+        ]
+        self.assertListEqual(coll.data, ColumnarTestCollection(records).data)
+        self.assertListEqual(coll.data, ColumnarTestCollection(self.df, columnar=True).data)
+
+
+    def test_invalid_frames_fall_back_and_raise_CollectionValidationError(self):
+        s = ColumnarTestSerializer(internal=InternalObject)
+
+        bad_kind = self.df.assign(kind=['a', 'b', 'c'])
+        with self.assertRaises(ColumnarFallback):
+            DataFrameLoader(s).load(bad_kind)
+        with self.assertRaises(CollectionValidationError):
+            ColumnarTestCollection(bad_kind)
+
+        bad_id = self.df.assign(id=['1', 'x', '3'])
+        with self.assertRaises(CollectionValidationError):
+            ColumnarTestCollection(bad_id)
+
+        unknown = self.df.assign(what=1)
+        with self.assertRaises(ColumnarFallback):
+            DataFrameLoader(s).load(unknown)
+
+
+    def test_schema_hooks_disable_columnar_load(self):
+
+        class HookSerializer(ColumnarTestSerializer):
+
+            @validates_schema
+            def check(self, data, **kwargs):
+                pass
+
+        self.assertFalse(can_load_columnar(HookSerializer(internal=InternalObject)))
+
+
+    def test_iso_datetime_columns_are_vectorized(self):
+
+        class IsoSerializer(BaseSerializer):
+            datet = fields.DateTime(allow_none=True)
+
+        df = pd.DataFrame({'datet': pd.to_datetime(['2017-05-04 10:30:24.500001', None])})
+        length, columns = DataFrameLoader(IsoSerializer(internal=InternalObject)).load(df)
+        self.assertEqual(columns['datet'][0].dtype, np.dtype('datetime64[ns]'))
+        self.assertListEqual(columns['datet'][1].tolist(), [False, True])
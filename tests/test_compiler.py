@@ -0,0 +1,118 @@
+""" tests for the compiled serializer fast path
+"""
+
+import unittest
+
+from binx.collection import InternalObject, BaseSerializer, BaseCollection, CollectionBuilder
+from binx.compiler import CompiledSerializer, can_compile_load, can_compile_dump
+from binx.exceptions import CollectionValidationError
+
+from marshmallow import fields, validates_schema, post_dump, EXCLUDE
+from marshmallow.validate import Range
+from marshmallow.exceptions import ValidationError
+
+from datetime import datetime
+
+
+class CompilerTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    name = fields.Str(allow_none=True)
+    number = fields.Float()
+    date = fields.Date()
+    datet = fields.DateTime()
+    tf = fields.Bool()
+    some_list = fields.List(fields.Integer())
+    some_dict = fields.Dict()
+    ranged = fields.Integer(validate=Range(min=0))
+
+    class Meta:
+        dateformat = '%Y-%m-%d'
+        datetimeformat = '%Y-%m-%d %H:%M:%S'
+
+
+class CompiledTestSerializer(CompilerTestSerializer):
+    compiled = True
+
+
+class TestCompiledSerializer(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [
+            {'id': 1, 'name': 'hep', 'number': 42.666, 'date': '2017-05-04', 'datet': '2017-05-04 10:30:24',
+                'tf': True, 'some_list': [1, 2, 3], 'some_dict': {'a': 1}, 'ranged': 4},
+            {'id': '2', 'name': None, 'number': 41, 'date': '2016-05-04', 'tf': 'true', 'ranged': 0},
+            {'id': 3.0},
+        ]
+
+
+    def test_compiled_load_and_dump_match_marshmallow(self):
+        plain = CompilerTestSerializer(internal=InternalObject)
+        compiled = CompiledTestSerializer(internal=InternalObject)
+
+        expected = plain.load(self.data, many=True)
+        test = compiled.load(self.data, many=True)
+        self.assertListEqual([vars(e) for e in expected], [vars(t) for t in test])
+        self.assertEqual(test[0].datet, datetime(2017, 5, 4, 10, 30, 24))
+
+        self.assertListEqual(plain.dump(expected, many=True), compiled.dump(test, many=True))
+        self.assertIsNotNone(compiled._get_compiled().load)
+        self.assertIsNotNone(compiled._get_compiled().dump)
+
+
+    def test_compiled_load_falls_back_for_identical_errors(self):
+        bad = self.data + [{'id': 'x'}, {'id': 4, 'ranged': -1}, {'id': 5, 'what': 'is this'}, {'name': 'no id'}]
+
+        errors = []
+        for serializer_class in (CompilerTestSerializer, CompiledTestSerializer):
+            with self.assertRaises(ValidationError) as ctx:
+                serializer_class(internal=InternalObject).load(bad, many=True)
+            errors.append(ctx.exception.messages)
+
+        self.assertDictEqual(errors[0], errors[1])
+
+
+    def test_compiled_collection_raises_CollectionValidationError(self):
+
+        class CompiledTestCollection(BaseCollection):
+            serializer_class = CompiledTestSerializer
+            internal_class = InternalObject
+
+        coll = CompiledTestCollection(self.data)
+        self.assertEqual(len(coll), 3)
+
+        with self.assertRaises(CollectionValidationError):
+            coll.load_data([{'id': 'x'}])
+
+
+    def test_compiled_load_with_compact_internals_and_exclude(self):
+        Internal = CollectionBuilder(compact=True).build(CompiledTestSerializer, internal_only=True)
+
+        s = CompiledTestSerializer(internal=Internal, unknown=EXCLUDE)
+        test = s.load([{'id': 1, 'unknown_field': 'ignored'}], many=True)
+        self.assertIsInstance(test[0], Internal)
+        self.assertEqual(s.dump(test, many=True), [{'id': 1}])
+
+
+    def test_hooks_disable_compilation(self):
+
+        class HookSerializer(CompiledTestSerializer):
+
+            @validates_schema
+            def check(self, data, **kwargs):
+                pass
+
+            @post_dump
+            def stamp(self, data, **kwargs):
+                data['stamped'] = True
+                return data
+
+        s = HookSerializer(internal=InternalObject)
+        self.assertFalse(can_compile_load(s))
+        self.assertFalse(can_compile_dump(s))
+
+        compiled = CompiledSerializer(s)
+        self.assertIsNone(compiled.load)
+        self.assertIsNone(compiled.dump)
+
+        out = s.dump(s.load([{'id': 1}], many=True), many=True)
+        self.assertEqual(out, [{'id': 1, 'stamped': True}])
@@ -0,0 +1,83 @@
+""" tests for executors and collection pickling
+"""
+
+import unittest
+import pickle
+
+from binx.collection import BaseSerializer, CollectionBuilder
+from binx.adapter import AbstractAdapter, register_adapter
+from binx.executor import SerialExecutor, ThreadExecutor, ProcessExecutor, set_default_executor, get_default_executor
+
+from marshmallow import fields
+from datetime import date
+
+
+class ExecutorASerializer(BaseSerializer):
+    a = fields.Integer()
+    d = fields.Date(allow_none=True)
+
+
+class ExecutorBSerializer(BaseSerializer):
+    a = fields.Integer()
+    d = fields.Date(allow_none=True)
+    b = fields.Integer()
+
+
+ExecutorACollection = CollectionBuilder().build(ExecutorASerializer)
+ExecutorBCollection = CollectionBuilder().build(ExecutorBSerializer)
+
+
+class ExecutorAToBAdapter(AbstractAdapter):
+    from_collection_class = ExecutorACollection
+    target_collection_class = ExecutorBCollection
+
+    def adapt(self, collection, **context):
+        data = [{'a': i.a, 'd': i.d, 'b': i.a * context['factor']} for i in collection]
+        return self.render_return(data, factor_used=context['factor'])
+
+register_adapter(ExecutorAToBAdapter)
+
+
+class TestExecutors(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{'a': 1, 'd': '2017-05-04'}, {'a': 2, 'd': None}]
+
+
+    def tearDown(self):
+        set_default_executor(None)
+
+
+    def test_built_collections_pickle_with_internals_or_columns(self):
+        for columnar in (False, True):
+            coll = ExecutorACollection(self.records, columnar=columnar)
+            coll.data   # fills the dump cache which is not pickled
+            test = pickle.loads(pickle.dumps(coll))
+
+            self.assertIs(type(test), ExecutorACollection)
+            self.assertEqual(test.is_columnar, columnar)
+            self.assertEqual(test[0].d, date(2017, 5, 4))
+            self.assertEqual(test.data, coll.data)
+            test.load_data([{'a': 3}])   # the serializer is rebuilt
+            self.assertEqual(len(test), 3)
+
+
+    def test_adapt_on_executors(self):
+        coll = ExecutorACollection(self.records)
+        expected = [{'a': 1, 'd': '2017-05-04', 'b': 10}, {'a': 2, 'd': None, 'b': 20}]
+
+        for executor in (SerialExecutor(), ThreadExecutor(max_workers=2), ProcessExecutor(max_workers=1)):
+            with executor:
+                b_coll, context = ExecutorBCollection.adapt(coll, executor=executor, factor=10)
+            self.assertIsInstance(b_coll, ExecutorBCollection)
+            self.assertEqual(b_coll.data, expected)
+            self.assertEqual(context, {'factor': 10, 'factor_used': 10})
+
+
+    def test_default_executor_is_used_by_adapt_many(self):
+        self.assertIsNone(get_default_executor())
+
+        with ThreadExecutor(max_workers=2) as executor:
+            set_default_executor(executor)
+            results = ExecutorACollection(self.records).adapt_many([ExecutorBCollection], factor=2)
+        self.assertEqual([r.b for r in results[ExecutorBCollection][0]], [2, 4])
@@ -0,0 +1,122 @@
+""" tests for collection content fingerprints
+"""
+
+import unittest
+import pickle
+
+from binx.collection import InternalObject, BaseSerializer, BaseCollection
+from binx.exceptions import FingerprintError
+from binx.fingerprint import encode_column
+
+import numpy as np
+import pandas as pd
+from marshmallow import fields
+
+
+class FingerprintTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    name = fields.Str(allow_none=True)
+    number = fields.Float(allow_none=True)
+    date = fields.Date(allow_none=True)
+    tags = fields.List(fields.Str())
+
+    class Meta:
+        dateformat = '%Y-%m-%d'
+
+
+class FingerprintTestCollection(BaseCollection):
+    serializer_class = FingerprintTestSerializer
+    internal_class = InternalObject
+
+
+class OtherFingerprintTestCollection(BaseCollection):
+    serializer_class = FingerprintTestSerializer
+    internal_class = InternalObject
+
+
+class NestedInnerSerializer(BaseSerializer):
+    x = fields.Integer()
+
+
+class NestedFingerprintTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    inner = fields.Nested(NestedInnerSerializer(internal=InternalObject), allow_none=True)
+    raw = fields.Raw()
+
+
+class NestedFingerprintTestCollection(BaseCollection):
+    serializer_class = NestedFingerprintTestSerializer
+    internal_class = InternalObject
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [
+            {'id': 1, 'name': 'hep', 'number': 1.5, 'date': '2017-05-04', 'tags': ['a', 'b']},
+            {'id': 2, 'name': None, 'number': None, 'date': None, 'tags': []},
+            {'id': 3, 'name': 'pup', 'number': 3.0, 'date': '2015-05-04', 'tags': ['c']},
+        ]
+
+
+    def test_equal_data_has_equal_fingerprints_across_storage(self):
+        fp = FingerprintTestCollection(self.records).fingerprint()
+
+        self.assertEqual(fp, FingerprintTestCollection(self.records).fingerprint())
+        self.assertEqual(fp, FingerprintTestCollection(self.records, columnar=True).fingerprint())
+
+        chunked = FingerprintTestCollection(self.records[:1], columnar=True)
+        chunked.load_data(self.records[1:])
+        self.assertEqual(fp, chunked.fingerprint())
+
+        restored = pickle.loads(pickle.dumps(FingerprintTestCollection(self.records)))
+        self.assertEqual(fp, restored.fingerprint())
+
+
+    def test_different_data_or_class_changes_fingerprint(self):
+        fp = FingerprintTestCollection(self.records).fingerprint()
+
+        changed = [dict(r) for r in self.records]
+        changed[1]['number'] = 0.0   # a null and a zero must not collide
+        self.assertNotEqual(fp, FingerprintTestCollection(changed).fingerprint())
+        self.assertNotEqual(fp, FingerprintTestCollection(self.records[:2]).fingerprint())
+        self.assertNotEqual(fp, FingerprintTestCollection(self.records[::-1]).fingerprint())
+        self.assertNotEqual(fp, OtherFingerprintTestCollection(self.records).fingerprint())
+
+
+    def test_incremental_fingerprint_matches_full(self):
+        for columnar in (False, True):
+            coll = FingerprintTestCollection(self.records[:1], columnar=columnar)
+            coll.fingerprint(incremental=True)
+            coll.load_data(self.records[1:])
+
+            self.assertEqual(coll.fingerprint(incremental=True), coll.fingerprint())
+            self.assertEqual(coll.fingerprint(), FingerprintTestCollection(self.records).fingerprint())
+
+
+    def test_encode_column_ignores_masked_values(self):
+        mask = np.array([False, True])
+        self.assertEqual(encode_column(np.array([1.0, np.nan]), mask), encode_column(np.array([1.0, 7.0]), mask))
+        self.assertEqual(encode_column(np.array(['a', 'x'], dtype='O'), mask),
+            encode_column(np.array(['a', None], dtype='O'), mask))
+
+
+    def test_nested_values_are_hashed_by_value(self):
+        records = [{'id': 1, 'inner': {'x': 2}}, {'id': 2, 'inner': None}]
+        fp = NestedFingerprintTestCollection(records).fingerprint()
+
+        self.assertEqual(fp, NestedFingerprintTestCollection(records).fingerprint())
+        self.assertEqual(fp, NestedFingerprintTestCollection(records, columnar=True).fingerprint())
+        changed = [{'id': 1, 'inner': {'x': 3}}, records[1]]
+        self.assertNotEqual(fp, NestedFingerprintTestCollection(changed).fingerprint())
+
+        with self.assertRaises(FingerprintError):   # NOTE a repr would hold a memory address
+            NestedFingerprintTestCollection([{'id': 1, 'raw': object()}]).fingerprint()
+
+
+    def test_absent_and_none_values_have_different_fingerprints(self):
+        for columnar in (False, True):
+            absent = FingerprintTestCollection([{'id': 1}], columnar=columnar).fingerprint()
+            none = FingerprintTestCollection([{'id': 1, 'name': None}], columnar=columnar).fingerprint()
+            self.assertNotEqual(absent, none)
+            self.assertEqual(absent, FingerprintTestCollection([{'id': 1}], columnar=not columnar).fingerprint())
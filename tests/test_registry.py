@@ -4,7 +4,9 @@ from builtins import *
 import unittest
 import os
 
-from binx.registry import get_class_from_collection_registry, register_adapter_to_collection, register_adaptable_collection
+from binx.registry import get_class_from_collection_registry, register_adapter_to_collection, register_adaptable_collection, \
+    adapter_path, registry_generation
+from binx import registry
 from binx.collection import InternalObject, BaseSerializer, BaseCollection
 from binx.exceptions import RegistryError
 
@@ -119,3 +121,42 @@ class TestRegistry(unittest.TestCase):
         obj = get_class_from_collection_registry(full)
         test = TestAnotherRegistryCollection in obj[1]['adaptable_from']
         self.assertTrue(test)
+
+
+    def test_adapter_path_is_cached_until_registry_generation_changes(self):
+
+        class TestPathCacheA(BaseCollection):
+            pass
+
+        class TestPathCacheB(BaseCollection):
+            pass
+
+        class DummyAdapter(object):
+            from_collection_class = TestPathCacheA
+            target_collection_class = TestPathCacheB
+
+        register_adapter_to_collection(TestPathCacheA.get_fully_qualified_class_path(), DummyAdapter)
+        generation = registry_generation()
+        register_adaptable_collection(TestPathCacheB.get_fully_qualified_class_path(), TestPathCacheA)
+        self.assertGreater(registry_generation(), generation)
+
+        path = adapter_path(TestPathCacheA, TestPathCacheB)
+        self.assertEqual(path, [DummyAdapter])
+        self.assertIn((TestPathCacheA, TestPathCacheB), registry._path_cache)
+
+        path.append('mutated')   # returned paths are copies
+        self.assertEqual(adapter_path(TestPathCacheA, TestPathCacheB), [DummyAdapter])
+
+        class TestPathCacheC(BaseCollection):
+            pass
+
+        class OtherDummyAdapter(object):
+            from_collection_class = TestPathCacheB
+            target_collection_class = TestPathCacheC
+
+        self.assertEqual(adapter_path(TestPathCacheA, TestPathCacheC), [])
+
+        # registering a new edge invalidates the cached empty path
+        register_adapter_to_collection(TestPathCacheB.get_fully_qualified_class_path(), OtherDummyAdapter)
+        register_adaptable_collection(TestPathCacheC.get_fully_qualified_class_path(), TestPathCacheB)
+        self.assertEqual(adapter_path(TestPathCacheA, TestPathCacheC), [DummyAdapter, OtherDummyAdapter])
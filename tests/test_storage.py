@@ -0,0 +1,231 @@
+""" tests for the columnar storage engine
+"""
+
+import os
+import unittest
+import unittest.mock
+import tempfile
+import shutil
+
+from binx.collection import InternalObject, BaseSerializer, BaseCollection
+from binx.exceptions import CollectionLoadError
+from binx.storage import ColumnStore, _string_array
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_frame_equal
+from marshmallow import fields
+
+from datetime import datetime, date
+
+
+class ColumnStoreTestSerializer(BaseSerializer):
+    id = fields.Integer(required=True)
+    name = fields.Str(allow_none=True)
+    number = fields.Float(allow_none=True)
+    date = fields.Date(allow_none=True)
+    datet = fields.DateTime(allow_none=True)
+    tf = fields.Bool()
+    some_list = fields.List(fields.Integer, allow_none=True)
+
+    class Meta:
+        dateformat = '%Y-%m-%d'
+        datetimeformat = '%Y-%m-%d %H:%M:%S'
+
+
+class ColumnStoreTestCollection(BaseCollection):
+    serializer_class = ColumnStoreTestSerializer
+    internal_class = InternalObject
+
+
+class TestColumnStore(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [
+            {'id': 1, 'name': 'hep', 'number': 42.666, 'date': '2017-05-04', 'datet': '2017-05-04 10:30:24', 'tf': True, 'some_list': [1, 2, 3]},
+            {'id': 2, 'name': None, 'number': 41.666, 'date': '2016-05-04', 'datet': None, 'tf': False, 'some_list': [4, 5, 6]},
+            {'id': 3, 'name': 'pup', 'number': None, 'date': '2015-05-04', 'datet': '2015-05-04 10:30:24', 'tf': True, 'some_list': None},
+        ]
+
+
+    def test_store_keeps_typed_arrays_and_masks(self):
+        coll = ColumnStoreTestCollection(self.data, columnar=True)
+        self.assertTrue(coll.is_columnar)
+
+        arr, mask = coll._data.column('id')
+        self.assertEqual(arr.dtype, np.dtype('int64'))
+        self.assertIsNone(mask)
+
+        arr, mask = coll._data.column('datet')
+        self.assertEqual(arr.dtype, np.dtype('datetime64[ns]'))
+        self.assertListEqual(mask.tolist(), [False, True, False])
+
+        arr, mask = coll._data.column('some_list')
+        self.assertEqual(arr.dtype, np.dtype('O'))
+        self.assertEqual(arr[0], [1, 2, 3])
+
+
+    def test_columnar_collection_matches_record_collection(self):
+        records = ColumnStoreTestCollection(self.data)
+        columnar = ColumnStoreTestCollection(self.data, columnar=True)
+
+        self.assertEqual(len(records), len(columnar))
+        self.assertListEqual(records.data, columnar.data)
+        self.assertEqual(records.to_json(), columnar.to_json())
+        assert_frame_equal(records.to_dataframe(), columnar.to_dataframe())
+
+
+    def test_columnar_getitem_and_iteration_return_internals(self):
+        coll = ColumnStoreTestCollection(self.data, columnar=True)
+
+        self.assertIsInstance(coll[0], InternalObject)
+        self.assertEqual(coll[-1].id, 3)
+        self.assertEqual(coll[1].date, date(2016, 5, 4))
+        self.assertEqual(coll[0].datet, datetime(2017, 5, 4, 10, 30, 24))
+        self.assertEqual(coll[1].tf, False)
+        self.assertIsNone(coll[1].name)            # allow_none fields come back as None
+        self.assertEqual([c.id for c in coll[0:2]], [1, 2])
+        self.assertEqual([c.id for c in coll], [1, 2, 3])
+
+        with self.assertRaises(IndexError):
+            coll[3]
+
+
+    def test_missing_non_required_fields_stay_missing(self):
+        coll = ColumnStoreTestCollection([{'id': 1, 'tf': True}, {'id': 2}], columnar=True)
+
+        self.assertFalse(hasattr(coll[1], 'tf'))
+        self.assertNotIn('tf', coll.data[1])
+
+
+    def test_absent_and_none_values_stay_apart(self):
+        records = [{'id': 1, 'tf': True}, {'id': 2, 'name': None, 'tf': False}]
+        listed = ColumnStoreTestCollection(records)
+        for coll in (ColumnStoreTestCollection(records, columnar=True),
+                ColumnStoreTestCollection(records[:1], columnar=True)._tail(0)):
+            if len(coll) == 1:
+                coll._append_collection(ColumnStoreTestCollection(records[1:], columnar=True))
+            self.assertEqual(coll.data, listed.data)
+            self.assertEqual(coll.to_json(), listed.to_json())
+            self.assertFalse(hasattr(coll[0], 'name'))
+            self.assertIsNone(coll[1].name)
+
+        assert_frame_equal(ColumnStoreTestCollection(records[:1], columnar=True).to_dataframe(),
+            ColumnStoreTestCollection(records[:1]).to_dataframe())
+
+
+    def test_attribute_fields_are_read_and_written_by_attribute(self):
+
+        class AttributeSerializer(BaseSerializer):
+            a = fields.Integer(required=True, attribute='aa')
+            b = fields.Float()
+
+        class AttributeCollection(BaseCollection):
+            serializer_class = AttributeSerializer
+            internal_class = InternalObject
+
+        records = [{'a': 1, 'b': 2.0}, {'a': 3}]
+        coll = AttributeCollection(records, columnar=True)
+        self.assertEqual(coll.data, records)
+        self.assertEqual(coll[0].aa, 1)
+        self.assertEqual(coll._data.column('a')[0].tolist(), [1, 3])
+        self.assertNotEqual(coll.fingerprint(), AttributeCollection([{'a': 5, 'b': 2.0}, {'a': 3}]).fingerprint())
+        self.assertEqual(coll.fingerprint(), AttributeCollection(records).fingerprint())
+
+
+    def test_columnar_load_data_appends_chunks(self):
+        coll = ColumnStoreTestCollection(columnar=True)
+        coll.load_data(self.data)
+        coll.load_data(pd.DataFrame(self.data[:2]))
+
+        self.assertEqual(len(coll), 5)
+        self.assertEqual([c.id for c in coll], [1, 2, 3, 1, 2])
+
+
+    def test_int_column_with_nulls_coerced_to_float_in_to_dataframe(self):
+
+        class NullIntSerializer(BaseSerializer):
+            test_id = fields.Integer(allow_none=True)
+
+        class NullIntCollection(BaseCollection):
+            serializer_class = NullIntSerializer
+            internal_class = InternalObject
+            columnar = True
+
+        coll = NullIntCollection([{'test_id': None}, {'test_id': 2}])
+        self.assertIsInstance(coll._data, ColumnStore)
+        check = coll.to_dataframe().to_dict('records')
+
+        self.assertTrue(np.isnan(check[0]['test_id']))
+        self.assertEqual(check[1]['test_id'], 2.0)
+
+
+    def test_empty_columnar_collection(self):
+        coll = ColumnStoreTestCollection(columnar=True)
+        self.assertEqual(len(coll), 0)
+        self.assertEqual(coll.data, [])
+        self.assertEqual(len(coll.to_dataframe()), 0)
+
+
+class TestNpyStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [
+            {'id': 1, 'name': 'hep', 'number': 42.666, 'date': '2017-05-04', 'datet': '2017-05-04 10:30:24', 'tf': True, 'some_list': [1, 2, 3]},
+            {'id': 2, 'name': None, 'number': 41.666, 'date': '2016-05-04', 'datet': None, 'tf': False, 'some_list': [4, 5, 6]},
+            {'id': 3, 'name': 'pup', 'number': None, 'date': '2015-05-04', 'datet': '2015-05-04 10:30:24', 'tf': True, 'some_list': None},
+        ]
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+
+    def test_from_npy_maps_arrays_without_validation(self):
+        for columnar in (False, True):
+            coll = ColumnStoreTestCollection(self.data, columnar=columnar)
+            coll.to_npy(self.path)
+
+            with unittest.mock.patch.object(BaseSerializer, 'load') as load:
+                mapped = ColumnStoreTestCollection.from_npy(self.path)
+            load.assert_not_called()
+
+            self.assertIsInstance(mapped._data.column('id')[0], np.memmap)
+            self.assertIsInstance(mapped._data.column('name')[0], np.memmap)   # strings are mapped too
+            self.assertFalse(mapped._data.column('number')[0].flags.writeable)
+            self.assertEqual(mapped.data, coll.data)
+            assert_frame_equal(mapped.to_dataframe(), coll.to_dataframe())
+            self.assertEqual(mapped.fingerprint(), coll.fingerprint())
+
+        mapped.load_data([{'id': 4, 'tf': False}])   # appends are copied into memory
+        self.assertEqual(len(mapped), 4)
+        self.assertEqual(mapped[1].name, None)
+
+        path = os.path.join(self.path, 'absent')
+        coll = ColumnStoreTestCollection([{'id': 1, 'tf': True}, {'id': 2, 'name': None}], columnar=True)
+        coll.to_npy(path)
+        self.assertEqual(ColumnStoreTestCollection.from_npy(path).data, coll.data)   # absent masks are saved
+
+
+    def test_from_npy_rejects_other_schemas(self):
+
+        class OtherSerializer(BaseSerializer):
+            id = fields.Str()
+
+        class OtherCollection(BaseCollection):
+            serializer_class = OtherSerializer
+            internal_class = InternalObject
+
+        ColumnStoreTestCollection(self.data).to_npy(self.path)
+        with self.assertRaises(CollectionLoadError):
+            OtherCollection.from_npy(self.path)
+        with self.assertRaises(CollectionLoadError):
+            ColumnStoreTestCollection.from_npy(self.path + '-missing')
+
+        ColumnStoreTestCollection([]).to_npy(self.path)
+        self.assertEqual(len(ColumnStoreTestCollection.from_npy(self.path)), 0)
+
+
+    def test_skewed_string_columns_are_not_padded(self):
+        skewed = np.array(['a'] * 100000 + ['x' * 10000], dtype='O')
+        self.assertIsNone(_string_array(skewed, None))
+        self.assertEqual(_string_array(np.array(['ab', None], dtype='O'), np.array([False, True])).dtype,
+            np.dtype('U2'))
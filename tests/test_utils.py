@@ -2,7 +2,7 @@
 """
 
 import unittest
-from binx.utils import bfs_shortest_path, ObjUtils, RecordUtils, DataFrameDtypeConversion
+from binx.utils import bfs_shortest_path, dijkstra_shortest_path, ObjUtils, RecordUtils, DataFrameDtypeConversion
 
 import pandas as pd
 from pandas.testing import assert_frame_equal
@@ -96,6 +96,33 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(result, test)
 
 
+    def test_bfs_shortest_path_handles_missing_vertices_and_long_chains(self):
+
+        graph = {i: {i + 1} for i in range(5000)}
+        graph[0].add(4000)
+        self.assertEqual(bfs_shortest_path(graph, 0, 4001), [0, 4000, 4001])
+        self.assertEqual(len(bfs_shortest_path(graph, 0, 3999)), 4000)
+
+        self.assertEqual(bfs_shortest_path(graph, 4001, 0), [])
+        self.assertEqual(bfs_shortest_path(graph, 'not a vertex', 0), [])
+        self.assertEqual(bfs_shortest_path(graph, 0, 0), [])
+
+
+    def test_dijkstra_shortest_path(self):
+
+        graph = {
+            'A': {'B': 1, 'D': 10},
+            'B': {'C': 1},
+            'C': {'D': 1},
+            'D': {'A': 1},
+        }
+        self.assertEqual(dijkstra_shortest_path(graph, 'A', 'D'), ['A', 'B', 'C', 'D'])
+        graph['A']['D'] = 2
+        self.assertEqual(dijkstra_shortest_path(graph, 'A', 'D'), ['A', 'D'])
+        self.assertEqual(dijkstra_shortest_path(graph, 'D', 'C'), ['D', 'A', 'B', 'C'])
+        self.assertEqual(dijkstra_shortest_path(graph, 'A', 'E'), [])
+
+
     def test_dfconv_date_to_string(self):
 
         # note that only datetime objects get converted to pd.Timestamps.